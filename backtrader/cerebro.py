@@ -1,10 +1,26 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 import datetime
 import collections
+import inspect
+import io
 import itertools
 import multiprocessing
+import pickle
+from concurrent.futures import (ProcessPoolExecutor, FIRST_COMPLETED,
+                                as_completed, wait)
+from functools import lru_cache, reduce
+from heapq import heappop, heappush
+from multiprocessing.shared_memory import SharedMemory
+from operator import attrgetter, itemgetter, mul
+from time import monotonic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 try:  # For new Python versions
     collectionsAbc = collections.abc  # collections.Iterable -> collections.abc.Iterable
@@ -12,7 +28,7 @@ except AttributeError:  # For old Python versions
     collectionsAbc = collections  # Используем collections.Iterable
 
 import backtrader as bt
-from .utils.py3 import (map, range, zip, with_metaclass, string_types,
+from .utils.py3 import (map, range, zip, string_types,
                         integer_types)
 
 from . import linebuffer
@@ -25,7 +41,142 @@ from .utils import OrderedDict, tzparse, num2date, date2num
 from .strategy import Strategy, SignalStrategy
 from .tradingcal import (TradingCalendarBase, TradingCalendar,
                          PandasMarketCalendar)
-from .timer import Timer
+from .timer import Timer, NO_BOUND
+
+# 定时器的共享默认参数(不可变，避免可变默认参数被共享修改)
+_ZERO_TD = datetime.timedelta(0)
+_EMPTY_TUPLE = ()
+
+# 数据按(时间框架, 压缩)排序的键
+_TFKEY = attrgetter('_timeframe', '_compression')
+
+# iterize中直接视为单个取值的标量类型(字符串虽可迭代但作为单个取值)
+_ITERIZE_SCALAR = string_types + integer_types + (float,)
+
+
+@lru_cache(maxsize=None)
+def _class_data_attrs(cls):
+    '''
+    返回类(含继承链)上以data开头的属性名，按类缓存
+
+    与实例自身的属性合并后等同于从dir(实例)中筛选，但不必每次合并排序整个继承链
+    '''
+    return frozenset(name for name in dir(cls) if name.startswith('data'))
+
+
+# 优化进程中缓存的cerebro实例，由_worker_init在每个进程启动时设置一次
+_WORKER_CEREBRO = None
+# 经纪人的初始状态(序列化字节)，每次运行前恢复，使各参数组合互不影响
+_WORKER_BROKER = None
+
+
+def _array_from_buffer(typecode, buf):
+    '''
+    由缓冲区重建array.array，用于反序列化预加载的数据行
+    '''
+    arr = array.array(typecode)
+    arr.frombytes(memoryview(buf).cast('B'))
+    return arr
+
+
+class _CerebroPickler(pickle.Pickler):
+    '''
+    序列化cerebro的Pickler，array.array(预加载的数据行)以PickleBuffer形式
+    输出，配合buffer_callback时作为带外缓冲区传递而不复制到序列化字节流中
+    '''
+    def reducer_override(self, obj):
+        if type(obj) is array.array:
+            return _array_from_buffer, (obj.typecode, pickle.PickleBuffer(obj))
+
+        return NotImplemented
+
+
+def _dumps_cerebro(cerebro, outofband=False):
+    '''
+    使用最高协议序列化cerebro
+
+    参数:
+        cerebro: 要序列化的cerebro实例
+        outofband: 为True时数组缓冲区不写入字节流，而是作为列表返回
+
+    返回:
+        tuple: (序列化字节, 带外缓冲区列表或None)
+    '''
+    buffers = [] if outofband else None
+    f = io.BytesIO()
+    pickler = _CerebroPickler(
+        f, protocol=pickle.HIGHEST_PROTOCOL,
+        buffer_callback=buffers.append if outofband else None)
+    pickler.dump(cerebro)
+    return f.getvalue(), buffers
+
+
+def _share_buffers(buffers):
+    '''
+    将带外缓冲区复制到一块共享内存中，供非fork启动的优化进程按名称挂载
+
+    返回:
+        tuple: (SharedMemory实例, (共享内存名称, 每个缓冲区的(偏移, 长度)列表))
+    '''
+    raws = [b.raw() for b in buffers]
+    shm = SharedMemory(create=True, size=max(1, sum(r.nbytes for r in raws)))
+    offsets = []
+    pos = 0
+    for raw in raws:
+        shm.buf[pos:pos + raw.nbytes] = raw
+        offsets.append((pos, raw.nbytes))
+        pos += raw.nbytes
+
+    return shm, (shm.name, offsets)
+
+
+def _worker_init(state_bytes, buffers=None):
+    '''
+    优化进程的初始化函数，每个进程只反序列化一次cerebro
+
+    buffers可以是带外缓冲区列表(fork启动)或_share_buffers返回的共享内存描述
+    '''
+    global _WORKER_CEREBRO, _WORKER_BROKER
+    if not isinstance(buffers, tuple):
+        cerebro = pickle.loads(state_bytes, buffers=buffers)
+    else:
+        shmname, offsets = buffers
+        shm = SharedMemory(name=shmname)
+        views = [shm.buf[pos:pos + size] for pos, size in offsets]
+        try:
+            cerebro = pickle.loads(state_bytes, buffers=views)
+        finally:
+            for view in views:  # 数组已复制出数据，释放视图后才能关闭共享内存
+                view.release()
+            shm.close()
+
+    # 经纪人在运行中累积订单、持仓和历史迭代器的状态，保存其初始状态
+    # (不含指回cerebro的引用)，每次运行前恢复
+    brokerstate = {k: v for k, v in vars(cerebro._broker).items()
+                   if k != 'cerebro'}
+    _WORKER_BROKER = pickle.dumps(brokerstate,
+                                  protocol=pickle.HIGHEST_PROTOCOL)
+    _WORKER_CEREBRO = cerebro
+
+
+def _worker_run(iterstrats):
+    '''
+    在优化进程中运行一块策略参数组合，只需传输参数组合本身
+
+    同一个cerebro依次运行各组合，每次运行前只重置上一次运行改变的状态
+    '''
+    cerebro = _WORKER_CEREBRO
+    broker = cerebro._broker
+    results = list()
+    for iterstrat in iterstrats:
+        cerebro._event_stop = False  # runstop只停止发出它的那次运行
+        vars(broker).clear()  # 经纪人恢复为初始状态
+        vars(broker).update(pickle.loads(_WORKER_BROKER))
+        broker.cerebro = cerebro
+        results.append(cerebro(iterstrat))
+
+    return results
+
 
 # Defined here to make it pickable. Ideally it could be defined inside Cerebro
 
@@ -37,7 +188,7 @@ class OptReturn(object):
             setattr(self, k, v)
 
 
-class Cerebro(with_metaclass(MetaParams, object)):
+class Cerebro(object, metaclass=MetaParams):
     '''参数:
 
       - preload (默认值: ``True``)
@@ -219,6 +370,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._dolive = False             # 是否有实时数据源的标志
         self._doreplay = False           # 是否有重放数据源的标志
         self._dooptimize = False         # 是否执行优化模式的标志
+        self._optcount = 1               # 优化参数组合的总数
         self.stores = list()             # 存储商店(Store)实例的列表
         self.feeds = list()              # 存储数据馈送(Feed)实例的列表
         self.datas = list()              # 存储数据源(Data)实例的列表
@@ -226,10 +378,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self.strats = list()             # 存储策略配置的列表
         self.optcbs = list()             # 存储优化回调函数的列表
         self.observers = list()          # 存储观察器配置的列表
+        self._obsconfigs = dict()        # 驻留的观察器配置，相同配置共享同一个元组
         self.analyzers = list()          # 存储分析器配置的列表
         self.indicators = list()         # 存储指标配置的列表
         self.sizers = dict()             # 存储仓位管理器的字典
         self.writers = list()            # 存储输出写入器的列表
+        self._csv_headers_cache = None   # 缓存的数据CSV头部(数据源id元组, 头部列表)
         self.storecbs = list()           # 存储商店回调的列表
         self.datacbs = list()            # 存储数据回调的列表
         self.signals = list()            # 存储信号的列表
@@ -237,15 +391,16 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._signal_concurrent = False  # 是否允许并发信号
         self._signal_accumulate = False  # 是否允许信号累积
 
-        self._dataid = itertools.count(1)  # 数据ID生成器，从1开始
+        self._dataid = 0                 # 最后分配的数据ID，ID从1开始
 
         self._broker = BackBroker()      # 创建默认的回测经纪人
         self._broker.cerebro = self      # 将经纪人与cerebro关联
 
         self._tradingcal = None          # 交易日历，默认为None
 
-        self._pretimers = list()         # 预定时器列表
-        self._ohistory = list()          # 订单历史列表
+        # 定时器和订单历史只追加和顺序遍历，使用deque避免列表扩容复制
+        self._pretimers = collections.deque()  # 预定时器队列
+        self._ohistory = collections.deque()   # 订单历史队列
         self._fhistory = None            # 资金历史，用于性能评估
 
     @staticmethod
@@ -259,16 +414,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
         返回:
             list: 转换后的可迭代列表，每个元素都是可迭代的
         '''
-        niterable = list()                          # 创建新的空列表存储结果
-        for elem in iterable:                       # 遍历输入的每个元素
-            if isinstance(elem, string_types):      # 如果元素是字符串类型
-                elem = (elem,)                      # 将字符串转换为单元素元组
-            elif not isinstance(elem, collectionsAbc.Iterable):  # 如果元素不是可迭代的
-                elem = (elem,)                      # 将非可迭代对象转换为单元素元组
-
-            niterable.append(elem)                  # 将处理后的元素添加到结果列表
-
-        return niterable                            # 返回处理后的列表
+        # 标量(字符串、整数、浮点数)和不可迭代对象包装为单元素元组
+        return [(elem,) if isinstance(elem, _ITERIZE_SCALAR) or
+                not isinstance(elem, collectionsAbc.Iterable) else elem
+                for elem in iterable]
 
     def set_fund_history(self, fund):
         '''
@@ -310,9 +459,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         pass                                        # 默认实现为空，子类可重写
 
     def _add_timer(self, owner, when,
-                   offset=datetime.timedelta(), repeat=datetime.timedelta(),
-                   weekdays=[], weekcarry=False,
-                   monthdays=[], monthcarry=True,
+                   offset=_ZERO_TD, repeat=_ZERO_TD,
+                   weekdays=_EMPTY_TUPLE, weekcarry=False,
+                   monthdays=_EMPTY_TUPLE, monthcarry=True,
                    allow=None,
                    tzdata=None, strats=False, cheat=False,
                    *args, **kwargs):
@@ -352,9 +501,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         return timer                                # 返回创建的定时器
 
     def add_timer(self, when,
-                  offset=datetime.timedelta(), repeat=datetime.timedelta(),
-                  weekdays=[], weekcarry=False,
-                  monthdays=[], monthcarry=True,
+                  offset=_ZERO_TD, repeat=_ZERO_TD,
+                  weekdays=_EMPTY_TUPLE, weekcarry=False,
+                  monthdays=_EMPTY_TUPLE, monthcarry=True,
                   allow=None,
                   tzdata=None, strats=False, cheat=False,
                   *args, **kwargs):
@@ -417,12 +566,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         elif hasattr(cal, 'valid_days'):  # 如果cal有valid_days属性(可能是pandas_market_calendars对象)
             cal = PandasMarketCalendar(calendar=cal)  # 创建PandasMarketCalendar实例
 
-        else:
-            try:
-                if issubclass(cal, TradingCalendarBase):  # 如果cal是TradingCalendarBase的子类
-                    cal = cal()  # 实例化该类
-            except TypeError:  # 捕获TypeError异常，通常在cal已经是实例时发生
-                pass  # 不做任何处理，保持cal不变
+        elif inspect.isclass(cal) and issubclass(cal, TradingCalendarBase):
+            cal = cal()  # 如果cal是TradingCalendarBase的子类，实例化该类
 
         self._tradingcal = cal  # 设置交易日历为处理后的cal
 
@@ -528,15 +673,23 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         self.analyzers.append((ancls, args, kwargs))  # 将Analyzer类及其参数添加到analyzers列表
 
-    def addobserver(self, obscls, *args, **kwargs):
+    def addobserver(self, obscls, *args, multi=False, **kwargs):
         '''
         添加Observer类到系统。实例化将在run时完成
         
         参数:
             obscls: Observer类
             *args, **kwargs: 实例化Observer类的参数
+            multi: 如果为True，该观察器将为系统中的每个"数据"添加一次
         '''
-        self.observers.append((False, obscls, args, kwargs))  # 添加Observer，False表示不是多数据观察器
+        config = (multi, obscls, args, kwargs)
+        try:
+            key = (multi, obscls, args, tuple(sorted(kwargs.items())))
+            config = self._obsconfigs.setdefault(key, config)  # 相同配置共享同一个元组
+        except TypeError:  # 参数不可哈希，不做驻留
+            pass
+
+        self.observers.append(config)  # 添加Observer配置
 
     def addobservermulti(self, obscls, *args, **kwargs):
         '''
@@ -546,7 +699,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
         
         相反的例子是CashValue，它观察系统范围的值
         '''
-        self.observers.append((True, obscls, args, kwargs))  # 添加Observer，True表示是多数据观察器
+        self.addobserver(obscls, *args, multi=True, **kwargs)  # 添加多数据观察器
 
     def addstorecb(self, callback):
         '''
@@ -588,12 +741,18 @@ class Cerebro(with_metaclass(MetaParams, object)):
         """
         内部方法，处理所有store的通知并分发给cerebro和策略，这是主方法
         """
+        # 循环外绑定局部变量，避免每条通知重复查找属性
+        runningstrats = self.runningstrats
+        storecbs = self.storecbs
+        notify_store = self.notify_store
         for store in self.stores:  # 遍历所有store
-            for notif in store.get_notifications():  # 获取每个store的所有通知
-                msg, args, kwargs = notif  # 解析通知消息
+            # 获取每个store的所有通知并解析通知消息
+            for msg, args, kwargs in store.get_notifications():
+                for callback in storecbs:  # 通知store回调
+                    callback(msg, *args, **kwargs)
 
-                self._notify_store(msg, *args, **kwargs)  # 通知cerebro
-                for strat in self.runningstrats:  # 遍历所有运行中的策略
+                notify_store(msg, *args, **kwargs)  # 通知cerebro
+                for strat in runningstrats:  # 遍历所有运行中的策略
                     strat.notify_store(msg, *args, **kwargs)  # 通知每个策略
 
     def adddatacb(self, callback):
@@ -612,11 +771,18 @@ class Cerebro(with_metaclass(MetaParams, object)):
         """
         内部方法，处理所有数据的通知并分发给cerebro和策略，这是主方法
         """
+        # 循环外绑定局部变量，避免每条通知重复查找属性
+        runningstrats = self.runningstrats
+        datacbs = self.datacbs
+        notify_data = self.notify_data
         for data in self.datas:  # 遍历所有数据
-            for notif in data.get_notifications():  # 获取每个数据的所有通知
-                status, args, kwargs = notif  # 解析通知消息
-                self._notify_data(data, status, *args, **kwargs)  # 通知cerebro
-                for strat in self.runningstrats:  # 遍历所有运行中的策略
+            # 获取每个数据的所有通知并解析通知消息
+            for status, args, kwargs in data.get_notifications():
+                for callback in datacbs:  # 通知数据回调
+                    callback(data, status, *args, **kwargs)
+
+                notify_data(data, status, *args, **kwargs)  # 通知cerebro
+                for strat in runningstrats:  # 遍历所有运行中的策略
                     strat.notify_data(data, status, *args, **kwargs)  # 通知每个策略
 
     def _notify_data(self, data, status, *args, **kwargs):
@@ -658,7 +824,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if name is not None:  # 如果提供了名称
             data._name = name  # 设置数据源的名称
 
-        data._id = next(self._dataid)  # 为数据源分配唯一ID
+        self._dataid += 1  # 为数据源分配唯一ID
+        data._id = self._dataid
         data.setenvironment(self)  # 设置数据源的环境为当前cerebro
 
         self.datas.append(data)  # 将数据添加到数据列表
@@ -803,19 +970,60 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         self._dooptimize = True  # 设置优化模式标志
         args = self.iterize(args)  # 确保args是可迭代的格式
-        optargs = itertools.product(*args)  # 计算位置参数的所有组合
+        optkeys = tuple(kwargs)  # 获取关键字参数的键，所有组合共享
+        vals = self.iterize(kwargs.values())  # 确保kwargs值是可迭代的格式
 
-        optkeys = list(kwargs)  # 获取关键字参数的键列表
+        # 只保存每个参数的取值列表，组合在运行时由_iter_optcombos惰性生成
+        # 避免一次性物化所有参数组合(大规模参数网格会占用大量内存)
+        args = [list(a) for a in args]
+        vals = [list(v) for v in vals]
+        self.strats.append((strategy, args, optkeys, vals))
 
-        vals = self.iterize(kwargs.values())  # 确保kwargs值是可迭代的格式
-        optvals = itertools.product(*vals)  # 计算关键字参数值的所有组合
+        # 累计组合总数(各策略条目组合数的乘积)，用于确定进程池任务块大小
+        self._optcount *= (reduce(mul, map(len, args), 1) *
+                           reduce(mul, map(len, vals), 1))
+
+    @staticmethod
+    def _iter_optcombos(entry):
+        '''
+        惰性生成一个策略条目的所有(策略类, 位置参数, 关键字, 关键字取值)组合
+
+        关键字参数以键元组和值元组的形式传递(键元组由所有组合共享)，
+        字典在runstrategies实例化策略时才创建，减少每个组合的对象分配和序列化大小
+
+        参数:
+            entry: self.strats中的条目。addstrategy添加的是只有一个组合的列表，
+                   optstrategy添加的是(策略类, 位置参数取值列表, 关键字, 关键字取值列表)
 
-        okwargs1 = map(zip, itertools.repeat(optkeys), optvals)  # 将键和值组合在一起
+        返回:
+            iterator: 每次产生一个(stratcls, args, keys, vals)元组
+        '''
+        if isinstance(entry, list):  # addstrategy添加的单次运行条目
+            for stratcls, args, kwargs in entry:
+                yield stratcls, args, tuple(kwargs), tuple(kwargs.values())
+            return
 
-        optkwargs = map(dict, okwargs1)  # 将组合转换为字典列表
+        stratcls, args, optkeys, vals = entry
+        for optargs in itertools.product(*args):  # 位置参数组合
+            for optvals in itertools.product(*vals):  # 关键字参数组合
+                yield stratcls, optargs, optkeys, optvals
 
-        it = itertools.product([strategy], optargs, optkwargs)  # 组合策略类、位置参数和关键字参数
-        self.strats.append(it)  # 将优化配置添加到策略列表
+    def _iterstrats(self, idx=0):
+        '''
+        惰性生成所有策略条目组合的笛卡尔积
+
+        与itertools.product不同，不会预先物化每个输入，内存占用与组合数量无关
+
+        返回:
+            iterator: 每次产生一个元组，包含每个策略条目的一个组合
+        '''
+        if idx == len(self.strats):
+            yield ()
+            return
+
+        for combo in self._iter_optcombos(self.strats[idx]):
+            for rest in self._iterstrats(idx + 1):
+                yield (combo,) + rest
 
     def addstrategy(self, strategy, *args, **kwargs):
         '''
@@ -910,6 +1118,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         # 确定是否需要预先加载数据(取决于optdatas参数和其他条件)
         predata = self.p.optdatas and self._dopreload and self._dorunonce
+        if predata:  # 数据已在主进程中预加载，每次运行都从头开始
+            for data in self.datas:
+                data.home()
+
         return self.runstrategies(iterstrat, predata=predata)  # 运行策略并返回结果
 
     def __getstate__(self):
@@ -919,10 +1131,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         返回:
             cerebro实例状态的副本，移除了runstrats属性
         '''
-        rv = vars(self).copy()  # 复制实例变量字典
-        if 'runstrats' in rv:  # 如果包含runstrats
-            del(rv['runstrats'])  # 删除runstrats，减少进程间传输数据量
-        return rv  # 返回修改后的状态
+        # 一次遍历构建不含runstrats的状态字典，减少进程间传输数据量
+        return {k: v for k, v in vars(self).items() if k != 'runstrats'}
 
     def runstop(self):
         '''
@@ -992,7 +1202,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
             self.runwriters.append(wr)  # 添加到运行写入器列表
 
         # 记录是否有写入器需要完整的CSV输出
-        self.writers_csv = any(map(lambda x: x.p.csv, self.runwriters))
+        self.writers_csv = any(w.p.csv for w in self.runwriters)
 
         self.runstrats = list()  # 初始化运行策略结果列表
 
@@ -1001,13 +1211,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
             if signalst is None:  # 如果信号策略未设置
                 # 尝试检查第一个普通策略是否为信号策略
                 try:
-                    signalst, sargs, skwargs = self.strats.pop(0)  # 取出第一个策略
+                    entry = self.strats.pop(0)  # 取出第一个策略
                 except IndexError:
                     pass  # 如果没有策略，不做任何处理
                 else:
-                    if not isinstance(signalst, SignalStrategy):  # 如果不是信号策略
-                        # 不是信号策略，重新插入到开头
-                        self.strats.insert(0, (signalst, sargs, skwargs))
+                    if isinstance(entry, list):  # addstrategy添加的单次运行策略
+                        signalst, sargs, skwargs = entry[0]
+
+                    if not isinstance(entry, list) or \
+                            not isinstance(signalst, SignalStrategy):
+                        # 不是信号策略，原样重新插入到开头
+                        self.strats.insert(0, entry)
                         signalst = None  # 标记为不存在
 
             if signalst is None:  # 再次检查
@@ -1025,7 +1239,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if not self.strats:  # 如果没有策略但有数据，添加默认策略
             self.addstrategy(Strategy)  # 添加默认策略类
 
-        iterstrats = itertools.product(*self.strats)  # 计算所有策略参数组合
+        iterstrats = self._iterstrats()  # 惰性生成所有策略参数组合
         if not self._dooptimize or self.p.maxcpus == 1:  # 如果不进行优化或只使用1个CPU
             # 跳过进程"生成"，直接运行
             for iterstrat in iterstrats:  # 遍历每个策略参数组合
@@ -1035,7 +1249,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     for cb in self.optcbs:  # 遍历优化回调
                         cb(runstrat)  # 调用回调处理完成的策略
         else:  # 使用多进程进行优化
-            if self.p.optdatas and self._dopreload and self._dorunonce:  # 如果优化数据选项开启
+            # 是否在主进程中预加载一次数据供所有优化进程使用
+            optpreload = self.p.optdatas and self._dopreload and self._dorunonce
+            if optpreload:  # 如果优化数据选项开启
                 for data in self.datas:  # 遍历所有数据
                     data.reset()  # 重置数据
                     if self._exactbars < 1:  # 如果不是精确柱模式
@@ -1044,16 +1260,44 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     if self._dopreload:  # 如果预加载
                         data.preload()  # 预加载数据
 
-            # 创建进程池进行并行优化
-            pool = multiprocessing.Pool(self.p.maxcpus or None)  # 创建进程池
-            for r in pool.imap(self, iterstrats):  # 将策略参数组合分配给进程
-                self.runstrats.append(r)  # 收集结果
-                for cb in self.optcbs:  # 遍历优化回调
-                    cb(r)  # 调用回调处理完成的策略
-
-            pool.close()  # 关闭进程池
+            # 创建进程池进行并行优化，cerebro只序列化一次并在每个进程初始化时加载
+            ncpus = self.p.maxcpus or multiprocessing.cpu_count()
+            # 按进程数确定任务块大小，组合以块为单位流式分配给进程
+            chunksize = max(1, self._optcount // (ncpus * 8))
+
+            # 数组缓冲区带外传递: fork启动的进程直接继承初始化参数，零拷贝
+            # 其他启动方式将缓冲区放入共享内存，进程按名称挂载，不经管道传输
+            # 未设置启动方式时使用平台默认方式(列表首项)，不在此处固定全局设置
+            startmethod = (multiprocessing.get_start_method(allow_none=True) or
+                           multiprocessing.get_all_start_methods()[0])
+            state, buffers = _dumps_cerebro(self, outofband=True)
+            shm = None
+            if startmethod != 'fork':
+                shm, buffers = _share_buffers(buffers)
 
-            if self.p.optdatas and self._dopreload and self._dorunonce:  # 清理资源
+            try:
+                mpcontext = multiprocessing.get_context(startmethod)
+                with ProcessPoolExecutor(max_workers=ncpus,
+                                         mp_context=mpcontext,
+                                         initializer=_worker_init,
+                                         initargs=(state, buffers)) as executor:
+                    # 回调按完成顺序调用，结果按参数组合的顺序收集
+                    chunks = dict()
+                    for chunkidx, rs in self._optmap(executor, iterstrats,
+                                                     chunksize, ncpus):
+                        chunks[chunkidx] = rs
+                        for r in rs:
+                            for cb in self.optcbs:  # 遍历优化回调
+                                cb(r)  # 调用回调处理完成的策略
+            finally:
+                if shm is not None:  # 释放共享内存
+                    shm.close()
+                    shm.unlink()
+
+            for chunkidx in range(len(chunks)):
+                self.runstrats.extend(chunks.pop(chunkidx))  # 收集结果
+
+            if optpreload:  # 清理资源
                 for data in self.datas:  # 遍历所有数据
                     data.stop()  # 停止数据
 
@@ -1063,11 +1307,45 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         return self.runstrats  # 返回所有策略结果列表
 
+    @staticmethod
+    def _optmap(executor, iterstrats, chunksize, ncpus):
+        '''
+        将策略参数组合按块提交给进程池，按完成顺序返回每个任务块的结果
+
+        同时挂起的任务块数量有上限，避免一次性提交所有组合
+
+        参数:
+            executor: 已初始化的ProcessPoolExecutor
+            iterstrats: 策略参数组合迭代器
+            chunksize: 每个任务块包含的组合数量
+            ncpus: 进程数量
+
+        返回:
+            iterator: 每次产生(任务块序号, 该块各组合的运行结果列表)
+        '''
+        pending = dict()  # future -> 任务块序号
+        maxpending = ncpus * 2  # 保持每个进程都有待处理的任务块
+        for chunkidx in itertools.count():
+            chunk = list(itertools.islice(iterstrats, chunksize))
+            if not chunk:
+                break
+
+            pending[executor.submit(_worker_run, chunk)] = chunkidx
+            if len(pending) < maxpending:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+        for future in as_completed(pending):
+            yield pending[future], future.result()
+
     def _init_stcount(self):
         """
         初始化策略计数器，用于为策略分配唯一ID
         """
-        self.stcount = itertools.count(0)  # 创建从0开始的计数器
+        self.stcount = 0  # 普通整数计数器，可以直接序列化
 
     def _next_stid(self):
         """
@@ -1076,14 +1354,16 @@ class Cerebro(with_metaclass(MetaParams, object)):
         返回:
             下一个唯一的策略ID
         """
-        return next(self.stcount)  # 返回计数器的下一个值
+        val = self.stcount  # 当前计数值即为策略ID
+        self.stcount = val + 1  # 计数器加一
+        return val
 
     def runstrategies(self, iterstrat, predata=False):
         '''
         内部方法，由run调用来运行一组策略
         
         参数:
-            iterstrat: 策略迭代器配置
+            iterstrat: 策略迭代器配置，每项为(策略类, 位置参数, 关键字, 关键字取值)
             predata: 是否已经预处理了数据
             
         返回:
@@ -1092,6 +1372,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._init_stcount()  # 初始化策略计数器
 
         self.runningstrats = runstrats = list()  # 创建运行策略列表
+
+        # 没有store时逐柱的商店通知必然为空，可以跳过。数据通知每个柱都要分发，
+        # 任何数据源都可能在_load中调用put_notification
+        self._has_stores = bool(self.stores)
+
         for store in self.stores:  # 启动所有商店
             store.start()  # 启动商店
 
@@ -1111,15 +1396,26 @@ class Cerebro(with_metaclass(MetaParams, object)):
         for feed in self.feeds:  # 启动所有数据馈送
             feed.start()  # 启动数据馈送
 
+        # 支持CSV的数据源和写入器在整个运行期间不变，只筛选一次
+        self._csv_datas = [d for d in self.datas if d.csv]
+        self._csv_writers = [w for w in self.runwriters if w.p.csv]
+        self._csv_data_getters = [d.getwritervalues for d in self._csv_datas]
+
         if self.writers_csv:  # 如果需要CSV输出
-            wheaders = list()  # 创建CSV头部列表
-            for data in self.datas:  # 遍历数据源
-                if data.csv:  # 如果数据源支持CSV
+            # 数据的CSV头部只取决于数据名称和线别名，优化时每次运行都相同
+            # 以数据源的id为键(数据的==会被重载为线运算，不能直接比较)
+            csvkey = tuple(map(id, self._csv_datas))
+            cache = self._csv_headers_cache
+            if cache is not None and cache[0] == csvkey:
+                wheaders = cache[1]  # 使用缓存的CSV头部
+            else:
+                wheaders = list()  # 创建CSV头部列表
+                for data in self._csv_datas:  # 遍历支持CSV的数据源
                     wheaders.extend(data.getwriterheaders())  # 获取CSV头部
+                self._csv_headers_cache = (csvkey, wheaders)
 
-            for writer in self.runwriters:  # 遍历写入器
-                if writer.p.csv:  # 如果写入器支持CSV
-                    writer.addheaders(wheaders)  # 添加CSV头部
+            for writer in self._csv_writers:  # 遍历支持CSV的写入器
+                writer.addheaders(wheaders)  # 添加CSV头部
 
         # self._plotfillers = [list() for d in self.datas]  # 注释掉的代码
         # self._plotfillers2 = [list() for d in self.datas]  # 注释掉的代码
@@ -1133,8 +1429,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 if self._dopreload:  # 如果预加载
                     data.preload()  # 预加载数据
 
-        for stratcls, sargs, skwargs in iterstrat:  # 遍历策略类和参数
-            sargs = self.datas + list(sargs)  # 将数据添加到策略参数前
+        datas = tuple(self.datas)  # 数据源在所有策略参数前，只转换一次
+        for stratcls, sargs, skeys, svals in iterstrat:  # 遍历策略类和参数
+            sargs = datas + tuple(sargs)  # 将数据添加到策略参数前
+            skwargs = dict(zip(skeys, svals))  # 此时才创建关键字参数字典
             try:
                 strat = stratcls(*sargs, **skwargs)  # 创建策略实例
             except bt.errors.StrategySkipError:
@@ -1154,60 +1452,87 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         if runstrats:  # 如果有策略要运行
             # 分离循环以提高清晰度
-            defaultsizer = self.sizers.get(None, (None, None, None))  # 获取默认仓位管理器
-            for idx, strat in enumerate(runstrats):  # 遍历所有策略
-                if self.p.stdstats:  # 如果使用标准统计
-                    strat._addobserver(False, observers.Broker)  # 添加Broker观察器
-                    if self.p.oldbuysell:  # 如果使用旧买卖显示
-                        strat._addobserver(True, observers.BuySell)  # 添加旧BuySell观察器
-                    else:
-                        strat._addobserver(True, observers.BuySell,  # 添加新BuySell观察器
-                                           barplot=True)
+            sizers = self.sizers  # 仓位管理器配置
+            defaultsizer = sizers.get(None, (None, None, None))  # 获取默认仓位管理器
+            # 以下内容对所有策略相同，循环前只取一次
+            obsconfs = self.observers  # 自定义观察器
+            indconfs = self.indicators  # 指标
+            anaconfs = self.analyzers  # 分析器
+            csv_writers = self._csv_writers  # 支持CSV的写入器
+            stdstats = self.p.stdstats  # 是否使用标准统计
+            if stdstats:
+                # 标准观察器: (是否多数据, 观察器类, 关键字参数)
+                stdobs = [(False, observers.Broker, {})]  # Broker观察器
+                if self.p.oldbuysell:  # 如果使用旧买卖显示
+                    stdobs.append((True, observers.BuySell, {}))
+                else:  # 新BuySell观察器
+                    stdobs.append((True, observers.BuySell, {'barplot': True}))
+
+                if self.p.oldtrades or len(self.datas) == 1:  # 旧交易显示或只有一个数据
+                    stdobs.append((False, observers.Trades, {}))
+                else:
+                    stdobs.append((False, observers.DataTrades, {}))
 
-                    if self.p.oldtrades or len(self.datas) == 1:  # 如果使用旧交易显示或只有一个数据
-                        strat._addobserver(False, observers.Trades)  # 添加Trades观察器
-                    else:
-                        strat._addobserver(False, observers.DataTrades)  # 添加DataTrades观察器
+            for idx, strat in enumerate(runstrats):  # 遍历所有策略
+                addobserver = strat._addobserver  # 绑定添加观察器方法
+                if stdstats:  # 如果使用标准统计
+                    for multi, obscls, obskwargs in stdobs:
+                        addobserver(multi, obscls, **obskwargs)
 
-                for multi, obscls, obsargs, obskwargs in self.observers:  # 添加自定义观察器
-                    strat._addobserver(multi, obscls, *obsargs, **obskwargs)
+                for multi, obscls, obsargs, obskwargs in obsconfs:  # 添加自定义观察器
+                    addobserver(multi, obscls, *obsargs, **obskwargs)
 
-                for indcls, indargs, indkwargs in self.indicators:  # 添加指标
-                    strat._addindicator(indcls, *indargs, **indkwargs)
+                addindicator = strat._addindicator  # 绑定添加指标方法
+                for indcls, indargs, indkwargs in indconfs:  # 添加指标
+                    addindicator(indcls, *indargs, **indkwargs)
 
-                for ancls, anargs, ankwargs in self.analyzers:  # 添加分析器
-                    strat._addanalyzer(ancls, *anargs, **ankwargs)
+                addanalyzer = strat._addanalyzer  # 绑定添加分析器方法
+                for ancls, anargs, ankwargs in anaconfs:  # 添加分析器
+                    addanalyzer(ancls, *anargs, **ankwargs)
 
                 # 获取策略的仓位管理器，如没有则使用默认
-                sizer, sargs, skwargs = self.sizers.get(idx, defaultsizer)
+                sizer, sargs, skwargs = sizers.get(idx, defaultsizer)
                 if sizer is not None:  # 如果有仓位管理器
                     strat._addsizer(sizer, *sargs, **skwargs)  # 添加仓位管理器
 
                 strat._settz(tz)  # 设置策略时区
                 strat._start()  # 启动策略
 
-                for writer in self.runwriters:  # 遍历写入器
-                    if writer.p.csv:  # 如果写入器支持CSV
-                        writer.addheaders(strat.getwriterheaders())  # 添加策略CSV头部
+                if csv_writers:  # 如果有支持CSV的写入器
+                    wheaders = strat.getwriterheaders()  # 策略CSV头部只获取一次
+                    for writer in csv_writers:  # 遍历支持CSV的写入器
+                        writer.addheaders(wheaders)  # 添加策略CSV头部
 
             if not predata:  # 如果数据未预处理
                 for strat in runstrats:  # 遍历所有策略
                     strat.qbuffer(self._exactbars, replaying=self._doreplay)  # 设置策略缓冲区
 
+            # 没有所有者的订单通知交给第一个策略
+            self._default_owner = runstrats[0]
+            # 每柱都会读取的参数在运行期间不变，取为普通属性
+            self._quicknotify = self.p.quicknotify
+
+            # 每柱写入的取值方法: 先数据后策略，预先绑定
+            self._strat_value_getters = [s.getwritervalues for s in runstrats]
+            self._csv_value_getters = (self._csv_data_getters +
+                                       self._strat_value_getters)
+
             for writer in self.runwriters:  # 启动所有写入器
                 writer.start()
 
-            # 准备定时器
-            self._timers = []  # 初始化定时器列表
-            self._timerscheat = []  # 初始化作弊定时器列表
-            for timer in self._pretimers:  # 遍历预定时器
+            # 准备定时器: 以(下次需要检查的时间, 添加顺序, 定时器)组成堆
+            self._timers = []  # 初始化定时器堆
+            self._timerscheat = []  # 初始化作弊定时器堆
+            for idx, timer in enumerate(self._pretimers):  # 遍历预定时器
                 # 预处理时区数据如需要
                 timer.start(self.datas[0])  # 启动定时器
 
+                # 首个柱状图时所有定时器都需要检查
+                entry = (NO_BOUND, idx, timer)
                 if timer.params.cheat:  # 如果是作弊定时器
-                    self._timerscheat.append(timer)  # 添加到作弊定时器列表
+                    self._timerscheat.append(entry)  # 添加到作弊定时器堆
                 else:
-                    self._timers.append(timer)  # 添加到普通定时器列表
+                    self._timers.append(entry)  # 添加到普通定时器堆
 
             # 根据预加载和runonce设置选择运行模式
             if self._dopreload and self._dorunonce:  # 如果预加载和runonce
@@ -1245,9 +1570,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 for a in strat.analyzers:  # 处理每个分析器
                     a.strategy = None  # 清除分析器对策略的引用
                     a._parent = None  # 清除分析器的父引用
-                    for attrname in dir(a):  # 遍历分析器的属性
-                        if attrname.startswith('data'):  # 如果是数据属性
-                            setattr(a, attrname, None)  # 清除数据引用
+                    # 实例上以data开头的属性加上类上缓存的同类属性
+                    attrnames = _class_data_attrs(type(a)).union(
+                        name for name in vars(a) if name.startswith('data'))
+                    for attrname in attrnames:  # 遍历分析器的数据属性
+                        setattr(a, attrname, None)  # 清除数据引用
 
                 # 创建优化返回对象，包含参数和分析器
                 oreturn = OptReturn(strat.params, analyzers=strat.analyzers, strategycls=type(strat))
@@ -1288,18 +1615,30 @@ class Cerebro(with_metaclass(MetaParams, object)):
         内部方法，通知经纪人并将经纪人通知传递给策略
         处理订单通知流程
         '''
-        self._broker.next()  # 调用经纪人的next方法
+        broker = self._broker  # 本地绑定经纪人
+        broker.next()  # 调用经纪人的next方法
+
+        # 大多数柱状图上没有任何通知。经纪人的通知队列为空的deque时直接返回，
+        # 省去get_notification调用。queue.Queue没有长度语义(总为真)，
+        # 而以None作为边界的经纪人在next之后队列必不为空，因此都不受影响
+        notifs = getattr(broker, 'notifs', None)
+        if notifs is not None and not notifs:
+            return
+
+        get_notification = broker.get_notification  # 本地绑定取通知方法
+        quicknotify = self._quicknotify  # 快速通知参数(运行开始时取值)
+        default_owner = self._default_owner  # 默认接收通知的策略
         while True:  # 循环处理所有通知
-            order = self._broker.get_notification()  # 获取通知
+            order = get_notification()  # 获取通知
             if order is None:  # 如果没有更多通知
                 break  # 退出循环
 
             owner = order.owner  # 获取订单所有者
             if owner is None:  # 如果没有所有者
-                owner = self.runningstrats[0]  # 默认使用第一个运行策略
-            
+                owner = default_owner  # 默认使用第一个运行策略
+
             # 向策略添加通知，根据quicknotify参数决定是否快速通知
-            owner._addnotification(order, quicknotify=self.p.quicknotify)
+            owner._addnotification(order, quicknotify=quicknotify)
 
     def _runnext_old(self, runstrats):
         '''
@@ -1308,21 +1647,24 @@ class Cerebro(with_metaclass(MetaParams, object)):
         这是旧版实现，仅处理线性数据
         '''
         data0 = self.datas[0]  # 获取第一个数据
+        # 其他数据只切片一次；单数据时为空列表，相关循环直接跳过
+        datas1 = self.datas[1:]
         d0ret = True  # 设置初始状态为True
         while d0ret or d0ret is None:  # 当data0返回True或None时继续
             lastret = False  # 重置lastret
             # 在移动数据前通知商店
             # 因为数据可能由于商店报告的错误而无法移动
-            self._storenotify()  # 处理商店通知
-            if self._event_stop:  # 如果请求停止
-                return
+            if self._has_stores:  # 仅在有store时处理商店通知
+                self._storenotify()  # 处理商店通知
+                if self._event_stop:  # 如果请求停止
+                    return
             self._datanotify()  # 处理数据通知
             if self._event_stop:  # 如果请求停止
                 return
 
             d0ret = data0.next()  # 调用data0的next方法
             if d0ret:  # 如果data0返回True
-                for data in self.datas[1:]:  # 遍历其他数据
+                for data in datas1:  # 遍历其他数据
                     if not data.next(datamaster=data0):  # 如果数据未传递
                         data._check(forcedata=data0)  # 强制检查输出
                         data.next(datamaster=data0)  # 重试next方法
@@ -1331,11 +1673,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 # 用于实时馈送可能不会立即产生柱状图
                 # 但需要运行循环以处理通知和获取重采样等
                 data0._check()  # 检查data0
-                for data in self.datas[1:]:  # 遍历其他数据
+                for data in datas1:  # 遍历其他数据
                     data._check()  # 检查数据
             else:  # 如果data0返回False
                 lastret = data0._last()  # 调用data0的_last方法
-                for data in self.datas[1:]:  # 遍历其他数据
+                for data in datas1:  # 遍历其他数据
                     lastret += data._last(datamaster=data0)  # 调用_last方法并累加结果
 
                 if not lastret:  # 如果没有由"lasts"改变
@@ -1406,23 +1748,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
         参数:
             runstrats: 运行的策略列表
         """
-        if not self.runwriters:  # 如果没有运行写入器
+        csv_writers = self._csv_writers  # 在runstrategies中预先筛选
+        if not csv_writers:  # 如果没有支持CSV的写入器
             return  # 直接返回
 
-        if self.writers_csv:  # 如果需要CSV输出
-            wvalues = list()  # 创建值列表
-            for data in self.datas:  # 遍历所有数据
-                if data.csv:  # 如果数据支持CSV
-                    wvalues.extend(data.getwritervalues())  # 获取数据值
-
-            for strat in runstrats:  # 遍历所有策略
-                wvalues.extend(strat.getwritervalues())  # 获取策略值
-
-            for writer in self.runwriters:  # 遍历所有写入器
-                if writer.p.csv:  # 如果写入器支持CSV
-                    writer.addvalues(wvalues)  # 添加值
+        # 依次拼接数据和策略的取值(取值方法在runstrategies中预先绑定)
+        wvalues = list(itertools.chain.from_iterable(
+            getter() for getter in self._csv_value_getters))
 
-                    writer.next()  # 调用写入器的next方法
+        for writer in csv_writers:  # 遍历支持CSV的写入器
+            writer.addvalues(wvalues)  # 添加值
+            writer.next()  # 调用写入器的next方法
 
     def _disable_runonce(self):
         '''
@@ -1455,7 +1791,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
         # 按时间框架和压缩排序数据
         # 例如: [(5min,1)最小时间框架, (30min,1), (1day,1)最大时间框架]
         datas = sorted(self.datas,
-                       key=lambda x: (x._timeframe, x._compression))
+                       key=_TFKEY)
         datas1 = datas[1:]  # 获取第一个数据之后的所有数据
         data0 = datas[0]  # 获取第一个数据
         d0ret = True  # 设置初始状态为True
@@ -1467,6 +1803,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
         rp = [i for i, x in enumerate(datas) if x.replaying]  # 重放数据索引
         rsonly = [i for i, x in enumerate(datas)  # 仅重采样数据索引
                   if x.resampling and not x.replaying]
+        rsonlyset = set(rsonly)  # 用于成员检查的集合
         onlyresample = len(datas) == len(rsonly)  # 是否所有数据都是重采样
         noresample = not rsonly  # 是否没有重采样数据
 
@@ -1478,10 +1815,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
         lastqcheck = False  # 重置lastqcheck
         dt0 = date2num(datetime.datetime.max) - 2  # 默认为最大值
 
+        # 只有实时数据源才可能在缓冲区中有实时数据
+        livedatas = [d for d in datas if d.islive()]
+
+        # 循环中反复调用的方法绑定为局部变量
+        storenotify = self._storenotify
+        datanotify = self._datanotify
+        has_stores = self._has_stores
+        brokernotify = self._brokernotify
+        check_timers = self._check_timers
+        next_writers = self._next_writers
+        cheat_on_open = self.p.cheat_on_open
+
         while d0ret or d0ret is None:  # 当data0返回True或None时继续
             # 如果任何数据在缓冲区中有实时数据，则不需要等待
             # 实例: 在实时交易中，如果data0有新数据进入缓冲区，haslivedata()返回True
-            newqcheck: bool = not any(d.haslivedata() for d in datas)  # 检查是否需要新的qcheck
+            newqcheck: bool = not any(d.haslivedata() for d in livedatas)  # 检查是否需要新的qcheck
             if not newqcheck:  # 如果不需要新的qcheck
                 # 如果没有数据达到实时状态或全部达到，等待下一个数据
                 # 实例: 实时交易中所有数据都已同步到最新点，livecount=ldatas_noclones，newqcheck=True
@@ -1491,19 +1840,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
             lastret = False  # 重置lastret
             # 在移动数据前通知商店
             # 例如: 连接到Interactive Brokers的商店可能报告连接断开错误
-            self._storenotify()  # 处理商店通知
-            if self._event_stop:  # 如果请求停止
-                return
-            self._datanotify()  # 处理数据通知
+            if has_stores:  # 仅在有store时处理商店通知
+                storenotify()  # 处理商店通知
+                if self._event_stop:  # 如果请求停止
+                    return
+            datanotify()  # 处理数据通知
             if self._event_stop:  # 如果请求停止
                 return
 
             # 记录开始时间并告诉馈送从qcheck值中折扣经过的时间
+            # 纯回测(没有实时数据)时不会真正等待，无需逐个数据计时
             drets = []  # 创建数据返回值列表
-            qstart = datetime.datetime.utcnow()  # 记录开始时间
+            if livedatas:  # 有实时数据时才计时
+                qstart = monotonic()  # 记录开始时间
             for d in datas:  # 遍历所有数据
-                qlapse = datetime.datetime.utcnow() - qstart  # 计算经过的时间
-                d.do_qcheck(newqcheck, qlapse.total_seconds())  # 执行qcheck
+                qlapse = monotonic() - qstart if livedatas else 0.0  # 计算经过的时间
+                d.do_qcheck(newqcheck, qlapse)  # 执行qcheck
                 # 实例: 调用data0.next()可能返回True表示有新数据，None表示等待中，False表示没有更多数据
                 drets.append(d.next(ticks=False))  # 调用next方法并记录返回值
 
@@ -1519,16 +1871,26 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     # 实例: 如果drets=[True, False, None]，dts会包含[data0时间, None, None]
                     dts.append(datas[i].datetime[0] if ret else None)  # 添加日期时间或None
 
-                # 获取最小日期时间的索引
+                # 一次遍历同时得到最小日期时间及其索引(并列时取最前者)
                 # 实例: 如果data0时间是10:00，data1时间是09:00，dt0将是09:00
                 if onlyresample or noresample:  # 如果只有重采样或没有重采样
-                    dt0 = min((d for d in dts if d is not None))  # 获取最小日期时间
+                    imaster, dt0 = min(((i, d) for i, d in enumerate(dts)
+                                        if d is not None), key=itemgetter(1))
                 else:  # 包含重采样的混合数据情况
-                    dt0 = min((d for i, d in enumerate(dts)  # 获取非仅重采样的最小日期时间
-                               if d is not None and i not in rsonly))
+                    # 获取非仅重采样的最小日期时间
+                    imaster, dt0 = min(((i, d) for i, d in enumerate(dts)
+                                        if d is not None and i not in rsonlyset),
+                                       key=itemgetter(1))
+                    # 与dts.index(dt0)保持一致: 排在前面的仅重采样数据时间相同时优先
+                    for i in rsonly:
+                        if i >= imaster:
+                            break
+                        if dts[i] == dt0:
+                            imaster = i
+                            break
 
                 # 例如: 如果dt0=09:00来自data1，dmaster=data1
-                dmaster = datas[dts.index(dt0)]  # 获取时间主数据
+                dmaster = datas[imaster]  # 获取时间主数据
                 self._dtmaster = dmaster.num2date(dt0)  # 转换为日期时间
                 self._udtmaster = num2date(dt0)  # 转换为用户日期时间
 
@@ -1579,14 +1941,14 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
             # 数据可能在next后生成新通知
             # 例如: 在实时交易中，数据源可能在获取新数据后通知连接状态变化
-            self._datanotify()  # 处理数据通知
+            datanotify()  # 处理数据通知
             if self._event_stop:  # 如果请求停止
                 return
 
             if d0ret or lastret:  # 如果由数据或过滤器产生了柱状图
                 # 实例: 在开盘前(cheat=True)检查是否有定时器需要触发
-                self._check_timers(runstrats, dt0, cheat=True)  # 检查作弊定时器
-                if self.p.cheat_on_open:  # 如果开启了开盘作弊
+                check_timers(runstrats, dt0, cheat=True)  # 检查作弊定时器
+                if cheat_on_open:  # 如果开启了开盘作弊
                     # 实例: 运行策略的next_open方法，可以在开盘价基础上创建订单
                     # 例如在09:00时刻，策略可以根据09:00的开盘价决定下单
                     for strat in runstrats:  # 遍历所有策略
@@ -1595,26 +1957,26 @@ class Cerebro(with_metaclass(MetaParams, object)):
                             return
 
             # 实例: 经纪人通知策略订单已执行，如"买入100股AAPL，成交价150.5"
-            self._brokernotify()  # 处理经纪人通知
+            brokernotify()  # 处理经纪人通知
             if self._event_stop:  # 如果请求停止
                 return
 
             if d0ret or lastret:  # 如果由数据或过滤器产生了柱状图
                 # 实例: 在正常时间(cheat=False)检查是否有定时器需要触发
-                self._check_timers(runstrats, dt0, cheat=False)  # 检查常规定时器
+                check_timers(runstrats, dt0, cheat=False)  # 检查常规定时器
                 # 实例: 策略在09:00时间点执行next，根据指标计算结果可能产生新订单
                 for strat in runstrats:  # 遍历所有策略
                     strat._next()  # 调用策略的_next方法
                     if self._event_stop:  # 如果请求停止
                         return
 
-                    self._next_writers(runstrats)  # 通知写入器
+                    next_writers(runstrats)  # 通知写入器
 
         # 停止前的最后通知机会
-        self._datanotify()  # 处理数据通知
+        datanotify()  # 处理数据通知
         if self._event_stop:  # 如果请求停止
             return
-        self._storenotify()  # 处理商店通知
+        storenotify()  # 处理商店通知
         if self._event_stop:  # 如果请求停止
             return
 
@@ -1643,36 +2005,33 @@ class Cerebro(with_metaclass(MetaParams, object)):
             strat._once()  # 调用策略的_once方法
             strat.reset()  # 重置策略线 - 由next调用next
 
+        # 单数据单策略(最常见的回测)走专门的快速路径
+        if self._runonce_fast(runstrats):
+            return
+
         # 策略的默认_once方法不做任何事情
         # 因此没有向前移动all datas/indicators/observers
         # 在调用_once之前已经安置好了，因此这里不需要
         # 因为指针在0位置
         datas = sorted(self.datas,  # 按时间框架和压缩排序数据
-                       key=lambda x: (x._timeframe, x._compression))
+                       key=_TFKEY)
 
-        while True:  # 持续循环直到没有数据
-            # 检查数据中的下一个日期
-            # 实例: data0可能下一个是2023-01-02，data1是2023-01-01，返回的dts会包含这两个日期
-            dts = [d.advance_peek() for d in datas]  # 获取所有数据的下一个日期
-            dt0 = min(dts)  # 获取最小日期
-            if dt0 == float('inf'):  # 如果没有更多数据
-                break  # 退出循环
+        # 循环中反复调用的方法绑定为局部变量
+        brokernotify = self._brokernotify
+        check_timers = self._check_timers
+        next_writers = self._next_writers
+        cheat_on_open = self.p.cheat_on_open
 
-            # 如果需要时间主
-            # dmaster = datas[dts.index(dt0)]  # 注释掉的代码
-            slen = len(runstrats[0])  # 获取策略长度
-            for i, dti in enumerate(dts):  # 遍历日期
-                if dti <= dt0:  # 如果日期小于等于最小日期
-                    # 实例: 如果dt0=2023-01-01，data0的下一个日期是2023-01-01，这里会推进data0
-                    datas[i].advance()  # 推进数据
-                else:
-                    # 实例: 如果dt0=2023-01-01，data1的下一个日期是2023-01-02，这里不推进data1
-                    pass  # 不做处理
+        for dt0, advdatas in self._runonce_steps(datas):  # 按时间顺序遍历所有时间点
+            # 实例: 如果dt0=2023-01-01，data0的下一个日期是2023-01-01，这里会推进data0
+            # data1的下一个日期是2023-01-02，这里不推进data1
+            for data in advdatas:
+                data.advance()  # 推进数据
 
             # 实例: 在开盘前(cheat=True)检查是否有定时器需要触发
-            self._check_timers(runstrats, dt0, cheat=True)  # 检查作弊定时器
+            check_timers(runstrats, dt0, cheat=True)  # 检查作弊定时器
 
-            if self.p.cheat_on_open:  # 如果开启了开盘作弊
+            if cheat_on_open:  # 如果开启了开盘作弊
                 # 实例: 策略可以在开盘价确定后立即执行订单，而不是等到当前bar结束
                 # 例如基于2023-01-01开盘价生成订单，而不是等到收盘
                 for strat in runstrats:  # 遍历所有策略
@@ -1681,12 +2040,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
                         return
 
             # 实例: 处理经纪人通知，如订单成交或订单拒绝
-            self._brokernotify()  # 处理经纪人通知
+            brokernotify()  # 处理经纪人通知
             if self._event_stop:  # 如果请求停止
                 return
 
             # 实例: 在正常时间(cheat=False)检查是否有定时器需要触发
-            self._check_timers(runstrats, dt0, cheat=False)  # 检查常规定时器
+            check_timers(runstrats, dt0, cheat=False)  # 检查常规定时器
 
             # 实例: 策略处理时间点dt0(如2023-01-01)的所有逻辑，包括计算指标、生成信号和下单
             for strat in runstrats:  # 遍历所有策略
@@ -1694,7 +2053,146 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 if self._event_stop:  # 如果请求停止
                     return
 
-                self._next_writers(runstrats)  # 通知写入器
+                next_writers(runstrats)  # 通知写入器
+
+    def _runonce_fast(self, runstrats):
+        '''
+        _runonce在单数据、单策略、无定时器且未开启开盘作弊时的专门实现
+
+        每一步只推进唯一的数据，时间点直接取自预加载的日期数组，省去排序、
+        时间线合并、定时器检查和策略遍历
+
+        返回:
+            bool: 是否已经运行，不满足条件时返回False且不做任何事情
+        '''
+        if (len(runstrats) != 1 or len(self.datas) != 1 or
+                self._timers or self._timerscheat or self.p.cheat_on_open):
+            return False
+
+        data0 = self.datas[0]
+        if type(data0).advance_peek is not bt.AbstractDataBase.advance_peek:
+            return False  # 自定义的下一个日期逻辑
+
+        dtarray = data0.lines.datetime.array
+        if not isinstance(dtarray, array.array):
+            return False  # 非预加载的缓冲区
+
+        strat = runstrats[0]
+        advance = data0.advance
+        brokernotify = self._brokernotify
+        oncepost = strat._oncepost
+        dt0s = dtarray[len(data0):data0.buflen()]  # 每个剩余的日期就是一步
+
+        if not self._csv_writers:  # 没有CSV写入器时每步少一次调用
+            for dt0 in dt0s:
+                advance()  # 推进数据
+
+                brokernotify()  # 处理经纪人通知
+                if self._event_stop:  # 如果请求停止
+                    return True
+
+                oncepost(dt0)  # 调用策略的_oncepost方法
+                if self._event_stop:  # 如果请求停止
+                    return True
+
+            return True
+
+        next_writers = self._next_writers
+        for dt0 in dt0s:
+            advance()  # 推进数据
+
+            brokernotify()  # 处理经纪人通知
+            if self._event_stop:  # 如果请求停止
+                return True
+
+            oncepost(dt0)  # 调用策略的_oncepost方法
+            if self._event_stop:  # 如果请求停止
+                return True
+
+            next_writers(runstrats)  # 通知写入器
+
+        return True
+
+    @staticmethod
+    def _runonce_schedule(datas):
+        '''
+        使用NumPy一次性计算_runonce的合并时间线
+
+        每一步的时间点是所有数据下一个日期的最小值，下一个日期等于该时间点的数据
+        被推进。对于日期非递减的预加载数据，每个数据的第k个重复日期值(v, k)
+        恰好对应一步，按(v, k)排序即可得到与逐步比较相同的结果
+
+        参数:
+            datas: 排序后的数据列表
+
+        返回:
+            tuple: (每步的时间点列表, 每步在数据索引列表中的起止边界, 数据索引列表)
+            如果无法预先计算(无NumPy、数据未预加载、日期无序等)则返回None
+        '''
+        if np is None:
+            return None
+
+        values, ranks, dindices = [], [], []
+        for i, d in enumerate(datas):
+            if type(d).advance_peek is not bt.AbstractDataBase.advance_peek:
+                return None  # 自定义的下一个日期逻辑
+
+            dtarray = d.lines.datetime.array
+            if not isinstance(dtarray, array.array):
+                return None  # 非预加载的缓冲区
+
+            v = np.frombuffer(dtarray[len(d):d.buflen()], dtype=np.float64)
+            if np.isnan(v).any() or (np.diff(v) < 0).any():
+                return None  # 日期无序，只能逐步比较
+
+            # 每个值在重复值中的序号
+            r = np.arange(v.size) - np.searchsorted(v, v, side='left')
+            values.append(v)
+            ranks.append(r)
+            dindices.append(np.full(v.size, i))
+
+        v = np.concatenate(values)
+        r = np.concatenate(ranks)
+        di = np.concatenate(dindices)
+        order = np.lexsort((di, r, v))  # 按日期、重复序号、数据索引排序
+        v, r, di = v[order], r[order], di[order]
+
+        newstep = np.ones(v.size, dtype=bool)
+        newstep[1:] = (v[1:] != v[:-1]) | (r[1:] != r[:-1])
+        starts = np.flatnonzero(newstep)
+        return v[starts].tolist(), starts.tolist() + [v.size], di.tolist()
+
+    def _runonce_steps(self, datas):
+        '''
+        产生_runonce的每一步: (时间点dt0, 需要推进的数据列表)
+
+        能预先计算时间线时使用_runonce_schedule，否则逐步比较各数据的下一个日期
+        '''
+        schedule = self._runonce_schedule(datas)
+        if schedule is not None:
+            dt0s, bounds, dindices = schedule
+            if len(datas) == 1:  # 单数据每一步都推进同一个数据
+                advdatas = tuple(datas)
+                for dt0 in dt0s:
+                    yield dt0, advdatas
+                return
+
+            for k, dt0 in enumerate(dt0s):
+                yield dt0, [datas[i] for i in dindices[bounds[k]:bounds[k + 1]]]
+            return
+
+        # 逐步比较时每步都要读取所有数据的下一个日期，预先绑定取值方法
+        peeks = [d.advance_peek for d in datas]
+        inf = float('inf')
+        while True:  # 持续循环直到没有数据
+            # 检查数据中的下一个日期
+            # 实例: data0可能下一个是2023-01-02，data1是2023-01-01，返回的dts会包含这两个日期
+            dts = [peek() for peek in peeks]  # 获取所有数据的下一个日期
+            dt0 = min(dts)  # 获取最小日期
+            if dt0 == inf:  # 如果没有更多数据
+                return
+
+            yield dt0, [d for d, dti in zip(datas, dts) if dti <= dt0]
 
     def _check_timers(self, runstrats, dt0, cheat=False):
         """
@@ -1705,9 +2203,20 @@ class Cerebro(with_metaclass(MetaParams, object)):
             dt0: 当前日期时间
             cheat: 是否是作弊模式(在broker前运行)
         """
-        timers = self._timers if not cheat else self._timerscheat  # 选择定时器列表
-        for t in timers:  # 遍历定时器
-            if not t.check(dt0):  # 检查定时器是否需要触发
+        timers = self._timers if not cheat else self._timerscheat  # 选择定时器堆
+        if not timers or timers[0][0] > dt0:  # 所有定时器都确定不会触发
+            return
+
+        # 只取出需要检查的定时器，并按添加顺序检查和通知
+        due = []
+        while timers and timers[0][0] <= dt0:
+            due.append(heappop(timers))
+        due.sort(key=itemgetter(1))
+
+        for _, idx, t in due:  # 遍历需要检查的定时器
+            fired = t.check(dt0)  # 检查定时器是否需要触发
+            heappush(timers, (t.nextcheck(), idx, t))  # 放回堆中
+            if not fired:
                 continue  # 不需要触发，继续下一个
 
             # 通知定时器所有者
@@ -21,12 +21,17 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 import collections
 import datetime
-import inspect
 import io
 import os.path
 
+try:
+    import numpy as np
+except ImportError:  # numpy为可选依赖，没有时不使用批量加载
+    np = None
+
 import backtrader as bt
 from backtrader import (date2num, num2date, time2num, TimeFrame, dataseries,
                         metabase)
@@ -38,6 +43,30 @@ from .resamplerfilter import Resampler, Replayer
 from .tradingcal import PandasMarketCalendar
 
 
+def _day_utcoffset(tz, daynum):
+    '''
+    返回时区tz在序号为daynum的一天内的UTC偏移，当天偏移有变化(夏令时切换)时返回None
+    '''
+    daystart = datetime.datetime.fromordinal(daynum)
+    dayend = datetime.datetime.combine(daystart, datetime.time.max)
+    delta = tz.localize(daystart).utcoffset()
+    if delta != tz.localize(dayend).utcoffset():
+        return None
+
+    return delta
+
+
+def _fixed_utcoffset(tz):
+    '''
+    返回固定偏移时区(UTC、FixedOffset、datetime.timezone等)的UTC偏移，
+    其他时区返回None
+    '''
+    try:
+        return tz.utcoffset(None)  # 有夏令时的时区需要具体时间，返回None或报错
+    except Exception:
+        return None
+
+
 class MetaAbstractDataBase(dataseries.OHLCDateTime.__class__):
     """
     DataFeed元类，用于自动注册所有非别名、非基类的数据源子类
@@ -156,13 +185,16 @@ class MetaAbstractDataBase(dataseries.OHLCDateTime.__class__):
         # 初始化过滤器列表
         _obj._filters = list()  # 普通过滤器
         _obj._ffilters = list()  # 带有last方法的过滤器
+        _obj._checkfilters = list()  # 带有check方法的过滤器
         for fp in _obj.p.filters:
-            if inspect.isclass(fp):  # 如果过滤器是类
+            if isinstance(fp, type):  # 如果过滤器是类
                 fp = fp(_obj)  # 实例化过滤器
                 if hasattr(fp, 'last'):  # 如果过滤器有last方法
                     _obj._ffilters.append((fp, [], {}))  # 添加到ffilters列表
 
             _obj._filters.append((fp, [], {}))  # 添加到filters列表
+            if hasattr(fp, 'check'):  # 如果过滤器有check方法
+                _obj._checkfilters.append((fp, [], {}))  # 添加到checkfilters列表
 
         return _obj, args, kwargs
 
@@ -226,6 +258,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     _qcheck = 0.0  # 检查事件的超时时间
 
     _tmoffset = datetime.timedelta()  # 时间偏移量
+    _tzinput_cache = (None, None)  # 输入时区按日缓存的UTC偏移
 
     # 标志是否正在进行重采样或重放
     resampling = 0
@@ -239,11 +272,14 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         """
         # 获取输出时区
         self._tz = self._gettz()
+        self._settzcache()
         # 设置时区到 datetime 行
         self.lines.datetime._settz(self._tz)
 
         # 初始化输入时区本地化器
         self._tzinput = bt.utils.date.Localizer(self._gettzinput())
+        # 输入时区按日缓存的UTC偏移: (日序号, 偏移量或None)
+        self._tzinput_cache = (None, None)
 
         # 转换用户输入的时间范围到输出时区
         if self.p.fromdate is None:
@@ -260,6 +296,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         self.sessionstart = time2num(self.p.sessionstart)
         self.sessionend = time2num(self.p.sessionend)
 
+        self._setloadplain()  # 条件允许时使用精简的load
+
         # 初始化交易日历
         self._calendar = cal = self.p.calendar
         if cal is None:
@@ -316,6 +354,30 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
 
         return nexteos, nextdteos
 
+    def _tzinput_num(self, dt):
+        """
+        将按输入时区表面值读取的时间转换为UTC数值
+        同一天内UTC偏移不变时按日缓存偏移，省去逐个bar的时区本地化；
+        当天有夏令时切换时逐个本地化
+        Args:
+            dt (float): 输入时区表面值的数值时间
+        Returns:
+            float: UTC数值时间
+        """
+        daynum = int(dt)
+        cacheday, delta = self._tzinput_cache
+        if daynum != cacheday:
+            delta = _day_utcoffset(self._tzinput, daynum)
+            self._tzinput_cache = (daynum, delta)
+
+        dtime = num2date(dt)  # get it in a naive datetime
+        if delta is None:
+            dtime = self._tzinput.localize(dtime)  # pytz compatible-ized
+            return date2num(dtime)  # keep UTC val
+
+        # 与date2num对本地化时间减去偏移的计算相同
+        return date2num(dtime - delta)
+
     def _gettzinput(self):
         """
         获取输入数据的时区
@@ -332,6 +394,17 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         """
         return tzparse(self.p.tz)
 
+    _tzoffset = None  # 固定偏移输出时区的UTC偏移
+    _tz_cache = (None, None)  # 输出时区按日缓存的UTC偏移: (日序号, 偏移量或None)
+
+    def _settzcache(self):
+        """
+        设置self._tz后调用，准备date2num使用的时区偏移缓存
+        """
+        tz = self._tz
+        self._tzoffset = None if tz is None else _fixed_utcoffset(tz)
+        self._tz_cache = (None, None)
+
     def date2num(self, dt):
         """
         将 datetime 对象转换为数值形式
@@ -340,10 +413,26 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         Returns:
             float: 数值形式的时间
         """
-        if self._tz is not None:
-            return date2num(self._tz.localize(dt))  # 如果有时区，进行本地化
+        tz = self._tz
+        if tz is None:
+            return date2num(dt)
+
+        if dt.tzinfo is not None:  # 已带时区的时间交给tz.localize处理(报错)
+            return date2num(tz.localize(dt))
+
+        # date2num对本地化的时间减去UTC偏移后计算，偏移已知时直接相减，结果相同
+        delta = self._tzoffset
+        if delta is None:  # 非固定偏移的时区按日缓存偏移
+            daynum = dt.toordinal()
+            cacheday, delta = self._tz_cache
+            if daynum != cacheday:
+                delta = _day_utcoffset(tz, daynum)
+                self._tz_cache = (daynum, delta)
+
+            if delta is None:  # 当天有夏令时切换
+                return date2num(tz.localize(dt))  # 如果有时区，进行本地化
 
-        return date2num(dt)
+        return date2num(dt - delta)
 
     def num2date(self, dt=None, tz=None, naive=True):
         """
@@ -405,6 +494,11 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         Returns:
             list: 通知列表
         """
+        if not self.notifs:  # 绝大多数周期没有通知，直接返回
+            return []
+
+        # 不直接替换队列：其他线程(如实时数据的store)可能已取得旧队列的引用，
+        # 替换后追加的通知会丢失。标记之后追加的通知留待下一次获取
         self.notifs.append(None)  # 添加标记，表示通知结束
         notifs = list()
         while True:
@@ -441,6 +535,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         self._barstack = collections.deque()
         self._barstash = collections.deque()
         self._laststatus = self.CONNECTED
+        # 堆栈读写bar时使用的数据行，启动时取一次
+        self._stacklines = tuple(self.itersize())
 
     def stop(self):
         """
@@ -493,6 +589,9 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         """
         fp = SimpleFilterWrapper(self, f, *args, **kwargs)
         self._filters.append((fp, fp.args, fp.kwargs))
+        if hasattr(fp, 'check'):
+            self._checkfilters.append((fp, fp.args, fp.kwargs))
+        self._setloadplain(False)
 
     def addfilter(self, p, *args, **kwargs):
         """
@@ -500,15 +599,22 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         Args:
             p: 过滤器类或实例
         """
-        if inspect.isclass(p):
+        if isinstance(p, type):
             pobj = p(self, *args, **kwargs)
             self._filters.append((pobj, [], {}))
 
             if hasattr(pobj, 'last'):
                 self._ffilters.append((pobj, [], {}))
 
+            if hasattr(pobj, 'check'):
+                self._checkfilters.append((pobj, [], {}))
+
         else:
             self._filters.append((p, args, kwargs))
+            if hasattr(p, 'check'):
+                self._checkfilters.append((p, args, kwargs))
+
+        self._setloadplain(False)
 
     def compensate(self, other):
         """
@@ -518,27 +624,44 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         """
         self._compensate = other
 
+    _tickattrs = None  # (tick_属性名, 数据行) 对，首次使用时生成
+
+    def _gettickattrs(self):
+        """
+        返回 tick_xxx 属性名与对应数据行的配对，以及第0条线的 tick_ 属性名和数据行
+        线的组成在实例化后不再变化，因此只计算一次
+        Returns:
+            tuple: ((属性名, 数据行), ...), 第0条线属性名, 第0条线数据行
+        """
+        tickattrs = self._tickattrs
+        if tickattrs is None:
+            lines = self.lines
+            pairs = tuple(('tick_' + lalias, getattr(lines, lalias))
+                          for lalias in self.getlinealiases()
+                          if lalias != 'datetime')
+            alias0 = self._getlinealias(0)
+            tickattrs = self._tickattrs = (
+                pairs, 'tick_' + alias0, getattr(lines, alias0))
+        return tickattrs
+
     def _tick_nullify(self):
         # These are the updating prices in case the new bar is "updated"
         # and the length doesn't change like if a replay is happening or
         # a real-time data feed is in use and 1 minutes bars are being
         # constructed with 5 seconds updates
-        for lalias in self.getlinealiases():
-            if lalias != 'datetime':
-                setattr(self, 'tick_' + lalias, None)
+        for tickattr, _ in self._gettickattrs()[0]:
+            setattr(self, tickattr, None)
 
         self.tick_last = None
 
     def _tick_fill(self, force=False):
         # If nothing filled the tick_xxx attributes, the bar is the tick
-        alias0 = self._getlinealias(0)
-        if force or getattr(self, 'tick_' + alias0, None) is None:
-            for lalias in self.getlinealiases():
-                if lalias != 'datetime':
-                    setattr(self, 'tick_' + lalias,
-                            getattr(self.lines, lalias)[0])
+        pairs, tickattr0, line0 = self._gettickattrs()
+        if force or getattr(self, tickattr0, None) is None:
+            for tickattr, line in pairs:
+                setattr(self, tickattr, line[0])
 
-            self.tick_last = getattr(self.lines, alias0)[0]
+            self.tick_last = line0[0]
 
     def advance_peek(self):
         if len(self) < self.buflen():
@@ -547,29 +670,31 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         return float('inf')  # max date else
 
     def advance(self, size=1, datamaster=None, ticks=True):
-        if ticks:
-            self._tick_nullify()
-
         # Need intercepting this call to support datas with
         # different lengths (timeframes)
         self.lines.advance(size)
 
+        # The tick_xxx values are either all refilled from the new bar or
+        # all nullified: decide first and touch them only once
+        fill = False
         if datamaster is not None:
             if len(self) > self.buflen():
                 # if no bar can be delivered, fill with an empty bar
                 self.rewind()
                 self.lines.forward()
-                return
-
-            if self.lines.datetime[0] > datamaster.lines.datetime[0]:
+            elif self.lines.datetime[0] > datamaster.lines.datetime[0]:
                 self.lines.rewind()
             else:
-                if ticks:
-                    self._tick_fill()
+                fill = True
         elif len(self) < self.buflen():
             # a resampler may have advance us past the last point
-            if ticks:
-                self._tick_fill()
+            fill = True
+
+        if ticks:
+            if fill:
+                self._tick_fill(force=True)
+            else:
+                self._tick_nullify()
 
     def next(self, datamaster=None, ticks=True):
 
@@ -613,12 +738,111 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         """
         预加载数据，直到加载完所有可用数据
         """
-        while self.load():
-            pass
+        if self._can_load_batch():
+            self._preload_batch()  # 子类支持批量加载时整块写入
+        else:
+            load = self.load  # 循环中只解析一次方法
+            while load():
+                pass
 
         self._last()
         self.home()
 
+    # 批量预加载取代的逐bar加载方法，子类在_load_batch之下重写其中任何一个时
+    # 批量结果不再等同于逐bar加载，必须回退到逐bar路径
+    _batch_replaces = ('load', '_load', '_loadline')
+
+    def _can_load_batch(self):
+        """
+        检查是否可以使用_load_batch批量预加载
+        Returns:
+            bool: 子类实现了_load_batch且没有在其下重写逐bar加载方法、
+                  没有过滤器和堆栈中的bar，且缓冲区为没有扩展位置(lookahead)
+                  和绑定的无界数组
+        """
+        if np is None:
+            return False
+
+        mro = type(self).__mro__
+
+        def definer(name):
+            # 返回定义该方法的最派生类在mro中的位置，没有定义时返回None
+            for i, cls in enumerate(mro):
+                if name in cls.__dict__:
+                    return i
+            return None
+
+        batchpos = definer('_load_batch')
+        if mro[batchpos] is AbstractDataBase:
+            return False  # 子类没有实现_load_batch
+
+        for name in self._batch_replaces:
+            pos = definer(name)
+            if pos is not None and pos < batchpos:
+                return False  # 逐bar加载方法在更派生的类中被重写
+
+        if self._filters or self._barstack or self._barstash:
+            return False  # 过滤器需要逐个bar处理
+
+        # 绑定的行需要逐个值传播，_bulk_forward不会写入绑定
+        return all(isinstance(line.array, array.array) and
+                   not line.extension and not line.bindings
+                   for line in self.lines)
+
+    def _preload_batch(self):
+        """
+        使用_load_batch预加载数据，按块应用fromdate/todate并一次写入各行
+        与逐个调用load的结果相同: 早于fromdate的bar被丢弃，遇到第一个晚于todate的bar时停止
+        """
+        lines = [(alias, self.lines[i])
+                 for i, alias in enumerate(self.getlinealiases())]
+        tzinput = self._tzinput
+        while True:
+            batch = self._load_batch(self._load_batch_size)
+            if not batch:
+                break
+
+            dts = np.asarray(batch['datetime'], dtype=np.float64)
+            if tzinput:  # 输入时间不是UTC，逐个本地化
+                tzinput_num = self._tzinput_num
+                dts = np.array([tzinput_num(dt) for dt in dts.tolist()],
+                               dtype=np.float64)
+
+            overs = np.flatnonzero(dts > self.todate)  # 晚于todate的bar
+            end = overs[0] if overs.size else dts.size
+            keep = ~(dts[:end] < self.fromdate)  # 早于fromdate的bar被丢弃
+            if keep.all():
+                keep = slice(None)  # 整块保留时不做布尔索引(避免多一次复制)
+
+            nkeep = len(dts[:end][keep])
+            if nkeep:
+                for alias, line in lines:
+                    if alias == 'datetime':
+                        vals = dts[:end][keep]
+                    elif alias in batch:
+                        vals = np.asarray(batch[alias], dtype=np.float64)
+                        vals = vals[:end][keep]
+                    else:
+                        vals = np.full(nkeep, np.nan)
+
+                    self._bulk_forward(line, vals)
+
+            if overs.size:  # 超过todate，不再加载
+                break
+
+    @staticmethod
+    def _bulk_forward(line, vals):
+        """
+        相当于对每个值调用一次line.forward()后写入line[0]
+        Args:
+            line: 没有扩展位置的无界模式数据行
+            vals (np.ndarray): float64取值数组
+        """
+        # 写入的位置就是数组末尾，连续数组直接按缓冲区读取，不再经过bytes
+        line.array.frombytes(memoryview(np.ascontiguousarray(vals)).cast('B'))
+        line.idx += vals.size
+        line.lencount += vals.size
+
     def _last(self, datamaster=None):
         # Last chance for filters to deliver something
         ret = 0
@@ -639,10 +863,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         return bool(ret)
 
     def _check(self, forcedata=None):
-        ret = 0
-        for ff, fargs, fkwargs in self._filters:
-            if not hasattr(ff, 'check'):
-                continue
+        # 只遍历添加时已确认带有check方法的过滤器
+        for ff, fargs, fkwargs in self._checkfilters:
             ff.check(self, _forcedata=forcedata, *fargs, **fkwargs)
 
     def load(self):
@@ -679,10 +901,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             if self._tzinput:
                 # Input has been converted at face value but it's not UTC in
                 # the input stream
-                dtime = num2date(dt)  # get it in a naive datetime
-                # localize it
-                dtime = self._tzinput.localize(dtime)  # pytz compatible-ized
-                self.lines.datetime[0] = dt = date2num(dtime)  # keep UTC val
+                self.lines.datetime[0] = dt = self._tzinput_num(dt)
 
             # Check standard date from/to filters
             if dt < self.fromdate:
@@ -717,6 +936,41 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         # Out of the loop ... no more bars or past todate
         return False
 
+    def _load_plain(self):
+        """
+        load 的精简版本：没有过滤器、没有输入时区转换、起止日期均为无穷时，
+        load 中的时间调整、日期范围检查和过滤器循环都不会起作用，可以全部省去
+        Returns:
+            bool: 是否成功加载数据
+        """
+        self.forward()
+
+        if self._fromstack() or self._fromstack(stash=True):
+            return True
+
+        _loadret = self._load()
+        if not _loadret:
+            self.backwards(force=True)  # undo data pointer
+            return _loadret
+
+        return True
+
+    def _setloadplain(self, plain=None):
+        """
+        选择实例使用的 load 实现
+        Args:
+            plain: None 表示根据当前设置判断，False 表示恢复完整的 load
+        """
+        self.__dict__.pop('load', None)  # 恢复类中定义的完整 load
+
+        if plain is None:
+            plain = (not self._filters and not self._tzinput and
+                     self.fromdate == float('-inf') and
+                     self.todate == float('inf'))
+
+        if plain:
+            self.load = self._load_plain
+
     def _load(self):
         """
         子类实现此方法以定义具体的数据加载逻辑
@@ -725,6 +979,32 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         """
         return False
 
+    _load_batch_size = 65536  # 批量预加载时每次请求的bar数量
+
+    def _load_batch(self, size):
+        """
+        可选的批量加载接口，子类实现后在没有过滤器时由preload使用
+        Args:
+            size (int): 最多返回的bar数量
+        Returns:
+            dict: 行别名到取值数组的映射(必须包含datetime，缺少的行填充NaN)，
+                  没有更多数据时返回None或空字典
+        """
+        return None
+
+    _stacklines = None  # 堆栈读写bar时使用的数据行(itersize的结果)
+
+    def _getstacklines(self):
+        """
+        返回堆栈读写bar时使用的数据行，未经start初始化时(子类未调用父类start)当场计算
+        Returns:
+            tuple: 有效大小内的数据行
+        """
+        lines = self._stacklines
+        if lines is None:
+            lines = self._stacklines = tuple(self.itersize())
+        return lines
+
     def _add2stack(self, bar, stash=False):
         '''Saves given bar (list of values) to the stack for later retrieval'''
         if not stash:
@@ -740,7 +1020,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             force (bool): 是否强制移除bar
             stash (bool): 是否将bar保存到临时堆栈
         '''
-        bar = [line[0] for line in self.itersize()]  # 获取当前bar的所有行数据
+        # 获取当前bar的所有行数据，直接按索引读取底层数组，等同于line[0]
+        bar = [line.array[line._idx] for line in self._getstacklines()]
         if not stash:  # 如果不是临时堆栈
             self._barstack.append(bar)  # 将bar添加到主堆栈
         else:  # 如果是临时堆栈
@@ -762,8 +1043,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         if forward:  # 如果需要前进数据指针
             self.forward()  # 前进数据指针
 
-        for line, val in zip(self.itersize(), bar):  # 遍历行数据和bar值
-            line[0 + ago] = val  # 将bar值更新到行数据中
+        for line, val in zip(self._getstacklines(), bar):  # 遍历行数据和bar值
+            line[ago] = val  # 将bar值更新到行数据中
 
     def _fromstack(self, forward=False, stash=False):
         '''从堆栈中加载值到行数据中以形成新的bar
@@ -780,7 +1061,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             if forward:  # 如果需要前进数据指针
                 self.forward()  # 前进数据指针
 
-            for line, val in zip(self.itersize(), coll.popleft()):  # 遍历行数据和堆栈中的值
+            for line, val in zip(self._getstacklines(), coll.popleft()):  # 遍历行数据和堆栈中的值
                 line[0] = val  # 将堆栈中的值更新到行数据中
 
             return True  # 返回True表示成功加载数据
@@ -940,11 +1221,7 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
             self.f = None
 
     def preload(self):
-        while self.load():
-            pass
-
-        self._last()
-        self.home()
+        super(CSVDataBase, self).preload()
 
         # preloaded - no need to keep the object around - breaks multip in 3.x
         self.f.close()
@@ -999,6 +1276,9 @@ class DataClone(AbstractDataBase):
     """
     _clone = True  # 标记此数据对象为克隆对象，用于区分原始数据源和克隆数据源
 
+    # 从原始数据源复制的参数
+    _CLONEPARAMS = ('sessionstart', 'sessionend', 'timeframe', 'compression')
+
     def __init__(self):
         """
         初始化数据克隆对象
@@ -1007,14 +1287,8 @@ class DataClone(AbstractDataBase):
         self.data = self.p.dataname  # 存储原始数据源的引用，p.dataname指向原始数据对象
         self._dataname = self.data._dataname  # 复制原始数据源的名称
 
-        # 复制原始数据源的日期/会话参数
-        self.p.fromdate = self.p.fromdate  # 复制起始日期参数
-        self.p.todate = self.p.todate  # 复制结束日期参数
-        self.p.sessionstart = self.data.p.sessionstart  # 复制会话开始时间参数
-        self.p.sessionend = self.data.p.sessionend  # 复制会话结束时间参数
-
-        self.p.timeframe = self.data.p.timeframe  # 复制时间帧参数(如天、分钟等)
-        self.p.compression = self.data.p.compression  # 复制数据压缩级别参数
+        # 复制原始数据源的会话/时间帧参数，起止日期使用克隆自身的参数
+        self.p._copyfrom(self.data.p, self._CLONEPARAMS)
 
     def _start(self):
         """
@@ -1025,6 +1299,7 @@ class DataClone(AbstractDataBase):
 
         # 复制时区信息
         self._tz = self.data._tz  # 复制原始数据源的时区设置
+        self._settzcache()  # 准备时区偏移缓存
         self.lines.datetime._settz(self._tz)  # 设置datetime行的时区
 
         self._calendar = self.data._calendar  # 复制交易日历
@@ -1048,6 +1323,8 @@ class DataClone(AbstractDataBase):
         super(DataClone, self).start()  # 调用父类的start方法
         self._dlen = 0  # 初始化数据长度计数器，用于跟踪已处理的数据点数量
         self._preloading = False  # 初始化预加载标志为False
+        # 克隆行与原始数据行按位置配对，_load中逐bar复制时使用
+        self._pairs = tuple(zip(self.lines, self.data.lines))
 
     def preload(self):
         """
@@ -1055,39 +1332,86 @@ class DataClone(AbstractDataBase):
         功能：预先加载所有数据，提高后续访问效率
         """
         self._preloading = True  # 设置预加载标志为True
+        # 原始数据源的当前位置: 批量复制的起点，逐bar复制时的计数
+        self._batchidx = len(self.data)
+        self._srcbuflen = self.data.buflen()  # 原始数据已预加载，长度在预加载期间不变
+        self._load = self._load_preload  # 预加载期间逐bar加载不必再判断模式
         super(DataClone, self).preload()  # 调用父类的preload方法
+        del self._load  # 恢复流式加载的_load
         self.data.home()  # 将原始数据源的指针重置到起始位置，因为预加载过程会前移指针
         self._preloading = False  # 预加载完成后，重置标志为False
 
+    def _can_load_batch(self):
+        """
+        只在预加载时，且原始数据源的行为无界数组时，才能批量复制
+        Returns:
+            bool: 是否可以使用_load_batch批量预加载
+        """
+        if not self._preloading:
+            return False
+
+        if not all(isinstance(dline.array, array.array)
+                   for dline in self.data.lines):
+            return False
+
+        return super(DataClone, self)._can_load_batch()
+
+    def _load_batch(self, size):
+        """
+        批量预加载：直接切片原始数据源(已预加载)中尚未复制的部分，
+        与逐个bar前进原始数据源并复制的结果相同
+        Args:
+            size (int): 最多返回的bar数量
+        Returns:
+            dict: 克隆行别名到取值数组的映射，原始数据用尽时返回None
+        """
+        start = self._batchidx
+        end = min(start + size, self._srcbuflen)
+        if start >= end:
+            return None
+
+        self._batchidx = end
+        # 与zip(self.lines, self.data.lines)相同，按位置对应各行
+        return {alias: np.frombuffer(dline.array[start:end], dtype=np.float64)
+                for alias, dline in zip(self.getlinealiases(), self.data.lines)}
+
     def _load(self):
         """
         加载数据的内部方法
         功能：从原始数据源复制当前数据点到克隆对象
+        预加载期间由preload替换为_load_preload
         返回：
             bool: 是否成功加载数据
         """
         # 假设原始数据已经在系统中
         # 简单地复制行数据
-        if self._preloading:  # 如果正在预加载
-            # 数据已预加载，我们也在预加载，可以前进直到有完整的bar或数据源用尽
-            self.data.advance()  # 前进原始数据源的指针
-            if len(self.data) > self.data.buflen():  # 如果原始数据已超出缓冲区大小
-                return False  # 返回False表示没有更多数据可加载
-
-            for line, dline in zip(self.lines, self.data.lines):  # 遍历所有行
-                line[0] = dline[0]  # 将原始数据行值复制到克隆数据行
-
-            return True  # 返回True表示成功加载数据
-
-        # 非预加载状态
         if not (len(self.data) > self._dlen):  # 如果原始数据长度未增加
             # 数据未超过最后看到的bar
             return False  # 返回False表示没有新数据加载
 
         self._dlen += 1  # 增加已见数据计数器
 
-        for line, dline in zip(self.lines, self.data.lines):  # 遍历所有行
-            line[0] = dline[0]  # 将原始数据行值复制到克隆数据行
+        for line, dline in self._pairs:  # 遍历所有行
+            line[0] = dline.array[dline._idx]  # 复制原始数据行值(直接按索引读取)
+
+        return True  # 返回True表示成功加载数据
+
+    def _load_preload(self):
+        """
+        预加载期间使用的_load
+        功能：数据已预加载，我们也在预加载，可以前进直到有完整的bar或数据源用尽
+        返回：
+            bool: 是否成功加载数据
+        """
+        # 前进原始数据源的指针(重采样等过滤器会读取原始数据的当前bar)
+        self.data.advance()
+        # 原始数据每次前进一个bar，用计数代替len(data)
+        self._batchidx += 1
+        if self._batchidx > self._srcbuflen:  # 如果原始数据已超出缓冲区大小
+            return False  # 返回False表示没有更多数据可加载
+
+        for line, dline in self._pairs:  # 遍历所有行
+            line[0] = dline.array[dline._idx]  # 复制原始数据行值(直接按索引读取)
 
         return True  # 返回True表示成功加载数据
 
@@ -22,10 +22,16 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 from datetime import date, datetime, time
+from itertools import islice
 
 from .. import feed
 from ..utils import date2num
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class BacktraderCSVData(feed.CSVDataBase):
     '''
@@ -58,6 +64,43 @@ class BacktraderCSVData(feed.CSVDataBase):
 
         return True
 
+    def _load_batch(self, size):
+        # Used by preload (with numpy available): parse up to size lines at
+        # once and return the columns, values are the same as _loadline's
+        if self.f is None:
+            return None
+
+        separator = self.separator
+        rows = [line.rstrip('\n').split(separator)
+                for line in islice(self.f, size)]
+        if not rows:
+            return None
+
+        sessionend = self.p.sessionend
+        dtnums = []
+        valtokens = []
+        for linetokens in rows:
+            dttxt = linetokens[0]
+            dt = date(int(dttxt[0:4]), int(dttxt[5:7]), int(dttxt[8:10]))
+            if len(linetokens) == 8:
+                tmtxt = linetokens[1]
+                tm = time(int(tmtxt[0:2]), int(tmtxt[3:5]), int(tmtxt[6:8]))
+                valtokens.append(linetokens[2:8])
+            else:
+                tm = sessionend
+                valtokens.append(linetokens[1:7])
+
+            dtnums.append(date2num(datetime.combine(dt, tm)))
+
+        values = np.array(valtokens, dtype=np.float64)
+
+        batch = dict(datetime=dtnums)
+        for i, alias in enumerate(('open', 'high', 'low', 'close',
+                                   'volume', 'openinterest')):
+            batch[alias] = values[:, i]
+
+        return batch
+
 
 class BacktraderCSV(feed.CSVFeedBase):
     DataCls = BacktraderCSVData
@@ -22,12 +22,12 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import datetime
+from time import monotonic
 
 import backtrader as bt
 from backtrader.feed import DataBase
 from backtrader import TimeFrame, date2num, num2date
-from backtrader.utils.py3 import (integer_types, queue, string_types,
-                                  with_metaclass)
+from backtrader.utils.py3 import queue, string_types, with_metaclass
 from backtrader.metabase import MetaParams
 from backtrader.stores import ibstore
 
@@ -390,16 +390,13 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         mult = ''  # 默认乘数
 
         # 分割ticker字符串
-        tokens = iter(dataname.split('-'))
+        tokens = dataname.split('-')
+        ntokens = len(tokens)
 
         # 获取股票代码，这是必须的
-        symbol = next(tokens)
-        try:
-            # 尝试获取证券类型，这也是必须的
-            sectype = next(tokens)
-        except StopIteration:
-            # 如果没有指定证券类型，使用默认值
-            sectype = self.p.sectype
+        symbol = tokens[0]
+        # 获取证券类型，如果没有指定证券类型，使用默认值
+        sectype = tokens[1] if ntokens > 1 else self.p.sectype
 
         # 检查证券类型是否为日期（针对期货和期权）
         if sectype.isdigit():
@@ -415,46 +412,46 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         if sectype == 'CASH':  # need to address currency for Forex
             symbol, curr = symbol.split('.')
 
-        # 尝试获取可选参数
-        try:
-            # 获取交易所
-            exch = next(tokens)  # 如果异常则使用默认值
-            # 获取货币
-            curr = next(tokens)  # 如果异常则使用默认值
+        # 可选参数按顺序出现，缺少的使用默认值
+        if ntokens > 2:
+            exch = tokens[2]  # 获取交易所
+        if ntokens > 3:
+            curr = tokens[3]  # 获取货币
+
+        # 期货/期权在交易所和货币之后还有按证券类型排列的字段，
+        # 按位置读取，令牌用尽时剩余字段保持默认值
+        i = 4
+        if ntokens > i and (sectype == 'FUT' or sectype == 'OPT'):
+            # 如果之前没有设置到期日，获取到期日
+            if not expiry:
+                expiry = tokens[i]
+                i += 1
 
             # 处理期货特有参数
             if sectype == 'FUT':
-                # 如果之前没有设置到期日，获取到期日
-                if not expiry:
-                    expiry = next(tokens)
-                # 获取乘数
-                mult = next(tokens)
-
-                # 尝试获取权利，看是否是期货期权(FOP)
-                right = next(tokens)
-                # 如果代码执行到这里，说明这是FOP而不是FUT
-                sectype = 'FOP'
-                strike, mult = float(mult), ''  # 将乘数赋值给行权价，并清空乘数
-
-                # 再次尝试获取乘数
-                mult = next(tokens)
+                if ntokens > i:
+                    mult = tokens[i]  # 获取乘数
+                    i += 1
+                    if ntokens > i:
+                        # 还有权利字段，说明这是期货期权(FOP)而不是FUT
+                        right = tokens[i]
+                        i += 1
+                        sectype = 'FOP'
+                        # 将乘数赋值给行权价，并清空乘数
+                        strike, mult = float(mult), ''
+                        if ntokens > i:
+                            mult = tokens[i]  # 再次尝试获取乘数
 
             # 处理期权特有参数
-            elif sectype == 'OPT':
-                # 如果之前没有设置到期日，获取到期日
-                if not expiry:
-                    expiry = next(tokens)
-                # 获取行权价
-                strike = float(next(tokens))  # 如果异常则使用默认值
-                # 获取权利（看涨/看跌）
-                right = next(tokens)  # 如果异常则使用默认值
-
-                # 获取乘数（对期权可能无用，但不会造成伤害）
-                mult = next(tokens)
-
-        except StopIteration:
-            # 如果参数不够，忽略错误
-            pass
+            elif ntokens > i:
+                strike = float(tokens[i])  # 获取行权价
+                i += 1
+                if ntokens > i:
+                    right = tokens[i]  # 获取权利（看涨/看跌）
+                    i += 1
+                    if ntokens > i:
+                        # 获取乘数（对期权可能无用，但不会造成伤害）
+                        mult = tokens[i]
 
         # 创建初始合约对象
         precon = self.ib.makecontract(
@@ -496,7 +493,8 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         # 初始化其他状态变量
         self._statelivereconn = False  # 实时状态重连标志
         self._subcription_valid = False  # 订阅状态
-        self._storedmsg = dict()  # 存储待处理的实时消息
+        self._storedmsg = None  # 存储待处理的实时消息
+        self._lastresub = float('-inf')  # 上次因错误重新订阅的时间
 
         # 如果IB未连接，直接返回
         if not self.ib.connected():
@@ -582,7 +580,7 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
     def haslivedata(self):
         """检查是否有实时数据可用"""
         # 如果存在已存储的消息或实时队列有效，返回True
-        return bool(self._storedmsg or self.qlive)
+        return self._storedmsg is not None or bool(self.qlive)
 
     def _load(self):
         """
@@ -597,44 +595,48 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         while True:
             # 处理实时数据状态
             if self._state == self._ST_LIVE:
-                try:
-                    # 尝试获取存储的消息或从队列获取实时消息，设置超时
-                    msg = (self._storedmsg.pop(None, None) or
-                           self.qlive.get(timeout=self._qcheck))
-                except queue.Empty:
-                    # 队列超时，表示当前没有新数据
-                    if True:
-                        return None
-
-                    # 以下代码已被禁用，直到进行进一步检查
-                    if not self._statelivereconn:
-                        return None  # 表示超时情况
-
-                    # 等待数据但什么都没收到 - 补充数据直到现在
-                    dtend = self.num2date(date2num(datetime.datetime.utcnow()))
-                    dtbegin = None
-                    if len(self) > 1:
-                        dtbegin = self.num2date(self.datetime[-1])
-
-                    # 请求历史数据进行补充
-                    self.qhist = self.ib.reqHistoricalDataEx(
-                        contract=self.contract,
-                        enddate=dtend, begindate=dtbegin,
-                        timeframe=self._timeframe,
-                        compression=self._compression,
-                        what=self.p.what, useRTH=self.p.useRTH, tz=self._tz,
-                        sessionend=self.p.sessionend)
-
-                    # 如果上一个状态不是延迟，发送延迟通知
-                    if self._laststatus != self.DELAYED:
-                        self.put_notification(self.DELAYED)
-
-                    # 切换到历史回填状态
-                    self._state = self._ST_HISTORBACK
-
-                    # 重置重连状态并继续循环
-                    self._statelivereconn = False
-                    continue  # 重新进入循环并处理历史回填状态
+                # 优先取出存储的消息，否则从队列获取实时消息，设置超时
+                msg = self._storedmsg
+                if msg is not None:
+                    self._storedmsg = None
+                else:
+                    try:
+                        msg = self.qlive.get(timeout=self._qcheck)
+                    except queue.Empty:
+                        # 队列超时，表示当前没有新数据
+                        if True:
+                            return None
+
+                        # 以下代码已被禁用，直到进行进一步检查
+                        if not self._statelivereconn:
+                            return None  # 表示超时情况
+
+                        # 等待数据但什么都没收到 - 补充数据直到现在
+                        dtend = self.num2date(
+                            date2num(datetime.datetime.utcnow()))
+                        dtbegin = None
+                        if len(self) > 1:
+                            dtbegin = self.num2date(self.datetime[-1])
+
+                        # 请求历史数据进行补充
+                        self.qhist = self.ib.reqHistoricalDataEx(
+                            contract=self.contract,
+                            enddate=dtend, begindate=dtbegin,
+                            timeframe=self._timeframe,
+                            compression=self._compression,
+                            what=self.p.what, useRTH=self.p.useRTH,
+                            tz=self._tz, sessionend=self.p.sessionend)
+
+                        # 如果上一个状态不是延迟，发送延迟通知
+                        if self._laststatus != self.DELAYED:
+                            self.put_notification(self.DELAYED)
+
+                        # 切换到历史回填状态
+                        self._state = self._ST_HISTORBACK
+
+                        # 重置重连状态并继续循环
+                        self._statelivereconn = False
+                        continue  # 重新进入循环并处理历史回填状态
 
                 # 处理连接中断情况
                 if msg is None:  # 历史/回填期间连接中断
@@ -652,50 +654,19 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
                     self._statelivereconn = self.p.backfill
                     continue
 
-                # 处理未订阅错误
-                if msg == -354:
-                    self.put_notification(self.NOTSUBSCRIBED)
-                    return False
-
-                # 处理连接中断错误
-                elif msg == -1100:  # 连接中断
-                    # 标记订阅无效并设置重连状态
-                    self._subcription_valid = False
-                    self._statelivereconn = self.p.backfill
-                    continue
-
-                # 处理连接中断但tickerId保留的情况
-                elif msg == -1102:  # 连接中断/恢复，tickerId保留
-                    # 消息可能重复
-                    if not self._statelivereconn:
-                        # 设置重连状态
-                        self._statelivereconn = self.p.backfill
-                    continue
-
-                # 处理连接中断且tickerId丢失的情况
-                elif msg == -1101:  # 连接中断/恢复，tickerId丢失
-                    # 消息可能重复
-                    self._subcription_valid = False
-                    if not self._statelivereconn:
-                        # 设置重连状态并重新订阅
-                        self._statelivereconn = self.p.backfill
-                        self.reqdata()  # 重新订阅
-                    continue
-
-                # 处理撤销事件，当前订阅失效
-                elif msg == -10225:  # 发生撤销事件，当前订阅被停用
-                    self._subcription_valid = False
-                    if not self._statelivereconn:
-                        # 设置重连状态并重新订阅
-                        self._statelivereconn = self.p.backfill
-                        self.reqdata()  # 重新订阅
-                    continue
-
-                # 处理意外的整型消息
-                elif isinstance(msg, integer_types):
-                    # 跳过历史数据的意外通知
-                    # 可能是"尚未处理的未连接"
-                    self.put_notification(self.UNKNOWN, msg)
+                # 整型消息是错误代码，查表分发到对应的处理方法
+                # 数据消息只需一次类型检查即可跳过所有错误代码的比较
+                if type(msg) is int:
+                    handler = self._LIVE_ERRORS.get(msg)
+                    if handler is None:
+                        # 跳过历史数据的意外通知
+                        # 可能是"尚未处理的未连接"
+                        self.put_notification(self.UNKNOWN, msg)
+                        continue
+
+                    ret = handler(self)
+                    if ret is not None:
+                        return ret
                     continue
 
                 # 根据预期的返回类型处理消息
@@ -723,7 +694,7 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
 
                 # 处理重连 - 尝试回填
                 # 保存消息
-                self._storedmsg[None] = msg  # 保存消息
+                self._storedmsg = msg  # 保存消息
 
                 # 执行回填操作
                 if self._laststatus != self.DELAYED:
@@ -783,7 +754,7 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
                     return False
 
                 # 处理意外的整型消息
-                elif isinstance(msg, integer_types):
+                elif type(msg) is int:
                     # 跳过历史数据的意外通知
                     # 可能是"尚未处理的未连接"
                     self.put_notification(self.UNKNOWN, msg)
@@ -834,6 +805,51 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
                 if not self._st_start():
                     return False
 
+    def _live_notsub(self):
+        """处理未订阅错误(-354)"""
+        self.put_notification(self.NOTSUBSCRIBED)
+        return False
+
+    def _live_connlost(self):
+        """处理连接中断(-1100)"""
+        # 标记订阅无效并设置重连状态
+        self._subcription_valid = False
+        self._statelivereconn = self.p.backfill
+
+    def _live_connrestored(self):
+        """处理连接中断/恢复，tickerId保留(-1102)"""
+        # 消息可能重复
+        if not self._statelivereconn:
+            # 设置重连状态
+            self._statelivereconn = self.p.backfill
+
+    def _live_resub(self):
+        """
+        处理连接中断/恢复且tickerId丢失(-1101)，
+        或发生撤销事件导致当前订阅被停用(-10225)
+        """
+        # 消息可能重复
+        self._subcription_valid = False
+        if not self._statelivereconn:
+            # 重连期间错误可能成批到达，qcheck间隔内只重新订阅一次
+            # 被跳过时不设置重连状态，之后的错误仍会触发重新订阅
+            now = monotonic()
+            if now - self._lastresub > self.p.qcheck:
+                # 设置重连状态并重新订阅
+                self._statelivereconn = self.p.backfill
+                self._lastresub = now
+                self.reqdata()  # 重新订阅
+
+    # 实时状态下错误代码到处理方法的映射
+    # 处理方法返回None表示继续状态机循环，否则作为_load的返回值
+    _LIVE_ERRORS = {
+        -354: _live_notsub,  # 数据未订阅
+        -1100: _live_connlost,  # 连接中断
+        -1102: _live_connrestored,  # 连接中断/恢复，tickerId保留
+        -1101: _live_resub,  # 连接中断/恢复，tickerId丢失
+        -10225: _live_resub,  # 发生撤销事件，当前订阅被停用
+    }
+
     def _st_start(self):
         """处理START状态的逻辑"""
         # 如果是历史模式
@@ -887,21 +903,22 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         一个完整的5秒K线由实时tick构成，包含开盘/最高/最低/收盘/成交量价格
         历史数据具有相同的数据，但使用'date'而不是'time'作为日期时间
         """
+        lines = self.lines
         # 转换日期时间
         dt = date2num(rtbar.time if not hist else rtbar.date)
         # 如果日期早于已交付的日期且不允许延迟通过，返回失败
-        if dt < self.lines.datetime[-1] and not self.p.latethrough:
+        if dt < lines.datetime[-1] and not self.p.latethrough:
             return False  # 不能交付早于已交付的数据
 
         # 设置日期时间
-        self.lines.datetime[0] = dt
+        lines.datetime[0] = dt
         # 将tick放入K线
-        self.lines.open[0] = rtbar.open  # 设置开盘价
-        self.lines.high[0] = rtbar.high  # 设置最高价
-        self.lines.low[0] = rtbar.low  # 设置最低价
-        self.lines.close[0] = rtbar.close  # 设置收盘价
-        self.lines.volume[0] = rtbar.volume  # 设置成交量
-        self.lines.openinterest[0] = 0  # 设置未平仓量为0
+        lines.open[0] = rtbar.open  # 设置开盘价
+        lines.high[0] = rtbar.high  # 设置最高价
+        lines.low[0] = rtbar.low  # 设置最低价
+        lines.close[0] = rtbar.close  # 设置收盘价
+        lines.volume[0] = rtbar.volume  # 设置成交量
+        lines.openinterest[0] = 0  # 设置未平仓量为0
 
         # 加载成功
         return True
@@ -912,23 +929,24 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         交付单个tick并用于整个价格集
         包含开盘/最高/最低/收盘/成交量价格
         """
+        lines = self.lines
         # 日期时间转换
         dt = date2num(rtvol.datetime)
         # 如果日期早于已交付的日期且不允许延迟通过，返回失败
-        if dt < self.lines.datetime[-1] and not self.p.latethrough:
+        if dt < lines.datetime[-1] and not self.p.latethrough:
             return False  # 不能交付早于已交付的数据
 
         # 设置日期时间
-        self.lines.datetime[0] = dt
+        lines.datetime[0] = dt
 
         # 将tick放入K线
         tick = rtvol.price  # 获取价格
-        self.lines.open[0] = tick  # 设置开盘价
-        self.lines.high[0] = tick  # 设置最高价
-        self.lines.low[0] = tick  # 设置最低价
-        self.lines.close[0] = tick  # 设置收盘价
-        self.lines.volume[0] = rtvol.size  # 设置成交量
-        self.lines.openinterest[0] = 0  # 设置未平仓量为0
+        lines.open[0] = tick  # 设置开盘价
+        lines.high[0] = tick  # 设置最高价
+        lines.low[0] = tick  # 设置最低价
+        lines.close[0] = tick  # 设置收盘价
+        lines.volume[0] = rtvol.size  # 设置成交量
+        lines.openinterest[0] = 0  # 设置未平仓量为0
 
         # 加载成功
         return True
@@ -283,6 +283,25 @@ class PandasData(feed.DataBase):
             # 更新映射中的值为列索引
             self._colmapping[k] = v
 
+        # 预先提取各列的值，_load中按行号直接取值，避免逐行调用iloc
+        df = self.p.dataname
+        self._colarrays = list()
+        for datafield in self.getlinealiases():
+            if datafield == 'datetime':
+                continue  # datetime单独处理
+
+            colindex = self._colmapping[datafield]
+            if colindex is not None:
+                line = getattr(self.lines, datafield)
+                self._colarrays.append((line, df.iloc[:, colindex].to_numpy()))
+
+        # datetime可能来自索引或特定列，保留为Timestamp列表
+        coldtime = self._colmapping['datetime']
+        if coldtime is None:
+            self._tstamps = df.index.to_list()
+        else:
+            self._tstamps = df.iloc[:, coldtime].to_list()
+
     def _load(self):
         '''
         加载并处理一行数据。
@@ -300,37 +319,18 @@ class PandasData(feed.DataBase):
           成功加载数据返回True，否则返回False
         '''
         self._idx += 1
+        idx = self._idx
 
-        if self._idx >= len(self.p.dataname):
+        if idx >= len(self._tstamps):
             # 已用尽所有行
             return False
 
-        # 设置标准数据字段
-        for datafield in self.getlinealiases():
-            if datafield == 'datetime':
-                # datetime需要特殊处理，跳过
-                continue
-
-            colindex = self._colmapping[datafield]
-            if colindex is None:
-                # 数据字段在流中标记为缺失：跳过
-                continue
-
-            # 获取要设置的行
-            line = getattr(self.lines, datafield)
-
-            # pandas索引：先列，后行
-            line[0] = self.p.dataname.iloc[self._idx, colindex]
+        # 设置标准数据字段，缺失的字段在start中已被排除
+        for line, values in self._colarrays:
+            line[0] = values[idx]
 
         # datetime转换
-        coldtime = self._colmapping['datetime']
-
-        if coldtime is None:
-            # datetime在标准索引中
-            tstamp = self.p.dataname.index[self._idx]
-        else:
-            # datetime在不同的列中...使用标准列索引
-            tstamp = self.p.dataname.iloc[self._idx, coldtime]
+        tstamp = self._tstamps[idx]
 
         # 通过datetime转换为float并存储
         dt = tstamp.to_pydatetime()
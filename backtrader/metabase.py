@@ -22,7 +22,6 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 from collections import OrderedDict
-import itertools
 import sys
 
 import backtrader as bt
@@ -111,19 +110,29 @@ def findowner(owned, cls, startlevel=2, skip=None):
         找到的所有者对象，如果未找到则返回None
     """
     # 从指定层级开始遍历调用栈帧，跳过当前函数和直接调用者
-    for framelevel in itertools.count(startlevel):
-        try:
-            # 获取特定层级的栈帧： _getframe() 方法是返回调用堆栈中指定深度（depth）的​​帧对象（frame object）​​，包含当前执行的代码上下文信息：
-                                # ​​depth=0​​（默认）：返回当前函数的帧对象。
-                                # ​​depth=1​​：返回调用当前函数的上一级帧对象（调用者）。
-                                # 若 depth 超过堆栈深度，抛出 ValueError。
-            frame = sys._getframe(framelevel)
-        except ValueError:
-            # 如果超出了调用栈的最大深度，说明没有找到符合条件的所有者，终止循环
+    # 只用一次 _getframe 定位起始帧，之后沿 f_back 逐级向上：
+    # 每层都调用 _getframe(level) 需要从栈顶重新数 level 层，整体为平方复杂度
+    try:
+        # 获取特定层级的栈帧： _getframe() 方法是返回调用堆栈中指定深度（depth）的​​帧对象（frame object）​​，包含当前执行的代码上下文信息：
+                            # ​​depth=0​​（默认）：返回当前函数的帧对象。
+                            # ​​depth=1​​：返回调用当前函数的上一级帧对象（调用者）。
+                            # 若 depth 超过堆栈深度，抛出 ValueError。
+        frame = sys._getframe(startlevel - 1)
+    except ValueError:
+        # 如果超出了调用栈的最大深度，说明没有找到符合条件的所有者
+        return None
+
+    while True:
+        frame = frame.f_back
+        if frame is None:
+            # 到达栈底，说明没有找到符合条件的所有者，终止循环
             break
 
+        # f_locals 每次访问都要同步帧的局部变量，只取一次
+        f_locals = frame.f_locals
+
         # 在常规代码中查找名为'self'的局部变量，这通常是对象实例
-        self_ = frame.f_locals.get('self', None)
+        self_ = f_locals.get('self', None)
         # 检查获取的self_对象是否满足条件：
         # 1. 不是要跳过的对象
         # 2. 不是被查找所有者的对象本身
@@ -135,7 +144,7 @@ def findowner(owned, cls, startlevel=2, skip=None):
 
         # 在元类方法中查找名为'_obj'的局部变量
         # 这是元编程中可能存在的对象引用
-        obj_ = frame.f_locals.get('_obj', None)
+        obj_ = f_locals.get('_obj', None)
         # 对'_obj'执行与'self'相同的检查
         if skip is not obj_:
             if obj_ is not owned and isinstance(obj_, cls):
@@ -351,6 +360,16 @@ class AutoInfoClass(object):
         """
         return getattr(self, name, default)
 
+    def _copyfrom(self, other, names):
+        """
+        从另一个参数对象中一次性复制指定参数的当前值
+
+        参数:
+            other: 源参数对象
+            names: 要复制的参数名序列
+        """
+        self.__dict__.update((name, getattr(other, name)) for name in names)
+
     @classmethod
     def _getkwargsdefault(cls):
         """
@@ -31,13 +31,16 @@ from .feed import AbstractDataBase
 from .metabase import MetaParams
 from .utils import date2num, num2date
 from .utils.py3 import integer_types, range, with_metaclass
-from .utils import TIME_MAX
+from .utils import TIME_MAX, TIME_MIN
 
 
 __all__ = ['SESSION_TIME', 'SESSION_START', 'SESSION_END', 'Timer']  # 定义此模块对外暴露的对象名称列表
 
 SESSION_TIME, SESSION_START, SESSION_END = range(3)  # 定义三个常量，分别表示会话时间、会话开始和会话结束
 
+ONE_DAY = timedelta(days=1)  # 一天的时间间隔
+NO_BOUND = float('-inf')  # nextcheck无法给出界限时的返回值
+
 
 class Timer(with_metaclass(MetaParams, object)):
     """定时器类，用于在指定时间触发事件"""
@@ -154,6 +157,31 @@ class Timer(with_metaclass(MetaParams, object)):
 
         return daycarry or curday  # 返回是否满足条件
 
+    def nextcheck(self):
+        """
+        返回一个数值时间界限，在此之前调用check必定返回False且不改变任何状态
+
+        - 当天已调用过(_lastcall)时，次日开始之前不会触发
+        - 触发时间已计算且仍在同一天、同一会话内时，_dtwhen之前不会触发
+
+        无法确定时返回NO_BOUND，调用方应照常调用check
+        """
+        lastcall = self._lastcall
+        if lastcall == date.max or self._curdate == date.max:
+            return NO_BOUND  # 无法计算次日
+
+        if not isinstance(lastcall, datetime):  # 当天已调用过
+            # 同一天内直接返回False，直到日期变化
+            return date2num(datetime.combine(lastcall + ONE_DAY, TIME_MIN))
+
+        dtwhen = self._dtwhen
+        if dtwhen is None or self._nexteos == datetime.min:
+            return NO_BOUND  # 触发时间或会话结束尚未计算
+
+        # 跨日(月/周/allow过滤)或越过会话结束都会改变状态，取三者最小值
+        nextday = datetime.combine(self._curdate + ONE_DAY, TIME_MIN)
+        return min(dtwhen, date2num(nextday), date2num(self._nexteos))
+
     def check(self, dt):
         """检查定时器是否应该触发"""
         d = num2date(dt)  # 将数值时间转换为日期时间对象
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class DoubleCloseLine(bt.feeds.BacktraderCSVData):
+    '''Customizes the per-line parsing'''
+    def _loadline(self, linetokens):
+        ret = super(DoubleCloseLine, self)._loadline(linetokens)
+        self.lines.close[0] *= 2.0
+        return ret
+
+
+class DoubleCloseLoad(bt.feeds.BacktraderCSVData):
+    '''Customizes the per-bar load'''
+    def _load(self):
+        ret = super(DoubleCloseLoad, self)._load()
+        if ret:
+            self.lines.close[0] *= 2.0
+        return ret
+
+
+# feed class -> last close
+CHKCLOSES = [
+    (bt.feeds.BacktraderCSVData, '4119.94'),
+    (DoubleCloseLine, '8239.88'),
+    (DoubleCloseLoad, '8239.88'),
+]
+
+
+def getcloses(feedcls, preload):
+    cerebro = bt.Cerebro(preload=preload, stdstats=False)
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    data = feedcls(dataname=datapath,
+                   fromdate=testcommon.FROMDATE, todate=testcommon.TODATE)
+    cerebro.adddata(data)
+    strat = cerebro.run()[0]
+    return list(strat.data.close.get(size=len(strat.data)))
+
+
+def test_run(main=False):
+    for feedcls, chkclose in CHKCLOSES:
+        closes_preload = getcloses(feedcls, preload=True)
+        closes_next = getcloses(feedcls, preload=False)
+        lastclose = '%.2f' % closes_preload[-1]
+
+        if main:
+            print(feedcls.__name__, lastclose,
+                  closes_preload == closes_next)
+        else:
+            assert closes_preload == closes_next
+            assert lastclose == chkclose
+
+
+if __name__ == '__main__':
+    test_run(main=True)
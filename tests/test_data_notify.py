@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+NOTIFYBAR = 10
+
+
+class NotifyingData(bt.feeds.BacktraderCSVData):
+    '''
+    Plain historical feed posting a notification while loading
+    '''
+    def _load(self):
+        ret = super(NotifyingData, self)._load()
+        if ret and len(self) == NOTIFYBAR:
+            self.put_notification(self.DELAYED)
+
+        return ret
+
+
+class StoreBackedData(NotifyingData):
+    '''
+    Historical feed backed by a store class (like IBData), without the store
+    being added to cerebro
+    '''
+    _store = bt.Store
+
+
+class NotifyStrategy(bt.Strategy):
+    def start(self):
+        self.notified = list()
+
+    def notify_data(self, data, status, *args, **kwargs):
+        self.notified.append((len(self), data._getstatusname(status)))
+
+
+def test_run(main=False):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+
+    for datacls in [NotifyingData, StoreBackedData]:
+        for runonce, preload in [(False, False), (False, True)]:
+            cerebro = bt.Cerebro(runonce=runonce, preload=preload,
+                                 stdstats=False)
+            cerebro.adddata(datacls(dataname=datapath))
+            cerebro.addstrategy(NotifyStrategy)
+            notified = cerebro.run()[0].notified
+
+            if main:
+                print(datacls.__name__, 'runonce', runonce,
+                      'preload', preload, notified)
+            else:
+                # delivered before the strategy sees the bar which posted it.
+                # With preload the bar was loaded before the first strategy bar
+                chklen = 0 if preload else NOTIFYBAR - 1
+                assert notified == [(chklen, 'DELAYED')]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
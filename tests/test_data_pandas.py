@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+def getframe():
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    df = pandas.read_csv(datapath, parse_dates=True, index_col=0)
+
+    # NaN values inside a column which is present
+    df.loc[df.index[::7], 'High'] = float('nan')
+    # a column which is present but fully NaN
+    df['Volume'] = float('nan')
+    # a column which is absent and has to be autodetected (-1)
+    return df.drop(columns=['OpenInterest'])
+
+
+def loadlines(df, preload, **kwargs):
+    data = bt.feeds.PandasData(dataname=df, **kwargs)
+    cerebro = bt.Cerebro(preload=preload, runonce=False, stdstats=False)
+    cerebro.adddata(data)
+    strat = cerebro.run()[0]
+    data = strat.data
+    return {alias: list(getattr(data.lines, alias).get(size=len(data)))
+            for alias in data.getlinealiases()}
+
+
+def samevals(vals, expected):
+    if len(vals) != len(expected):
+        return False
+
+    for val, exp in zip(vals, expected):
+        if math.isnan(exp):
+            if not math.isnan(val):
+                return False
+        elif val != exp:
+            return False
+
+    return True
+
+
+def test_run(main=False):
+    if pandas is None:
+        return  # pandas is an optional dependency
+
+    df = getframe()
+    dfcol = df.reset_index()  # datetime in a column instead of the index
+    nans = [float('nan')] * len(df)
+
+    expected = dict(
+        datetime=[bt.date2num(ts.to_pydatetime()) for ts in df.index],
+        open=df['Open'].tolist(),
+        high=df['High'].tolist(),
+        low=nans,  # column mapping set to None
+        close=df['Close'].tolist(),
+        volume=nans,  # fully NaN column
+        openinterest=nans,  # autodetected (-1), but missing
+    )
+
+    for preload in [True, False]:
+        for frame, kwargs in [(df, dict()), (dfcol, dict(datetime='Date'))]:
+            lines = loadlines(frame, preload, low=None, **kwargs)
+
+            for alias, exp in expected.items():
+                same = samevals(lines[alias], exp)
+                if main:
+                    print('preload', preload, 'datetime', kwargs, alias, same)
+                else:
+                    assert same
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class RecordStrategy(bt.Strategy):
+    '''Records the length, datetime and close of every data on each bar'''
+    def __init__(self):
+        for data in self.datas:
+            btind.SMA(data, period=3)
+
+        self.records = list()
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        rec = [len(self)]
+        for data in self.datas:
+            if len(data):
+                rec.extend([len(data), data.datetime[0], data.close[0]])
+            else:
+                rec.extend([0, None, None])  # not yet delivering
+
+        self.records.append(tuple(rec))
+
+
+class DropWeekday(object):
+    '''Filter removing the bars of a given weekday from a data feed'''
+    def __init__(self, data, weekday=2):
+        self.weekday = weekday
+
+    def __call__(self, data):
+        if data.datetime.date(0).weekday() == self.weekday:
+            data.backwards()
+            return True  # bar removed
+
+        return False
+
+
+def getdatas():
+    # daily and weekly with overlapping but different timestamps, plus a
+    # daily feed with a shorter date range and one missing a weekday
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    late = bt.feeds.BacktraderCSVData(
+        dataname=datapath,
+        fromdate=datetime.datetime(2006, 3, 15),
+        todate=datetime.datetime(2006, 10, 31))
+
+    holes = testcommon.getdata(0)
+    holes.addfilter(DropWeekday)
+
+    return [testcommon.getdata(0), testcommon.getdata(1), late, holes]
+
+
+def runrecords(runonce, stepwise=False):
+    cerebro = bt.Cerebro(runonce=runonce, preload=True, stdstats=False)
+    for data in getdatas():
+        cerebro.adddata(data)
+
+    cerebro.addstrategy(RecordStrategy)
+
+    if stepwise:
+        # force the stepwise comparison of next dates instead of the
+        # precomputed timeline
+        cerebro._runonce_schedule = lambda datas: None
+
+    return cerebro.run()[0].records
+
+
+def test_run(main=False):
+    schedule = runrecords(runonce=True)
+    stepwise = runrecords(runonce=True, stepwise=True)
+    nextmode = runrecords(runonce=False)
+
+    if main:
+        print(len(schedule), schedule == stepwise, schedule == nextmode)
+    else:
+        assert schedule == stepwise
+        assert schedule == nextmode
+
+
+if __name__ == '__main__':
+    test_run(main=True)
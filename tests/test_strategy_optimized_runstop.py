@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+STOPPERIOD = 5
+STOPBAR = 50
+PERIODS = range(5, 12)
+
+# runstop in one combination must not leak into the other combinations a
+# worker process runs afterwards
+CHKBARS = [(5, 50), (6, 255), (7, 255), (8, 255), (9, 255), (10, 255),
+           (11, 255)]
+
+
+class BarCount(bt.Analyzer):
+    def start(self):
+        self.bars = 0
+
+    def next(self):
+        self.bars += 1
+
+    def get_analysis(self):
+        return dict(bars=self.bars)
+
+
+class RunStopStrategy(bt.Strategy):
+    params = (
+        ('period', 15),
+    )
+
+    def __init__(self):
+        btind.SMA(self.data, period=self.p.period)
+
+    def next(self):
+        if self.p.period == STOPPERIOD and len(self) == STOPBAR:
+            self.env.runstop()
+
+
+def test_run(main=False):
+    cerebro = bt.Cerebro(maxcpus=2, stdstats=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(RunStopStrategy, period=PERIODS)
+    cerebro.addanalyzer(BarCount, _name='barcount')
+
+    results = cerebro.run()
+    bars = [(r[0].params.period, r[0].analyzers.barcount.bars)
+            for r in results]
+
+    if main:
+        print(bars)
+    else:
+        assert bars == CHKBARS
+
+
+if __name__ == '__main__':
+    test_run(main=True)
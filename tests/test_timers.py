@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+# Calls are recorded as (timer name, bar datetime, timer "when")
+
+# number of notifications per timer
+CHKCOUNTS = {
+    'repeat30': 336, 'cheat': 189, 'weekcarry': 32, 'sessoffset': 21,
+    'cerebro': 13, 'sessend': 13, 'monthdays': 3,
+}
+
+# the first notifications in delivery order: cheat timers go before the
+# regular ones on the same bar
+CHKFIRST = [
+    ('sessoffset', '2006-01-02T09:15:00', '2006-01-02T09:15:00'),
+    ('repeat30', '2006-01-02T10:00:00', '2006-01-02T10:00:00'),
+    ('repeat30', '2006-01-02T10:30:00', '2006-01-02T10:30:00'),
+    ('cheat', '2006-01-02T11:00:00', '2006-01-02T11:00:00'),
+    ('repeat30', '2006-01-02T11:00:00', '2006-01-02T11:00:00'),
+    ('repeat30', '2006-01-02T11:30:00', '2006-01-02T11:30:00'),
+    ('cheat', '2006-01-02T11:45:00', '2006-01-02T11:45:00'),
+    ('repeat30', '2006-01-02T12:00:00', '2006-01-02T12:00:00'),
+    ('cheat', '2006-01-02T12:30:00', '2006-01-02T12:30:00'),
+    ('repeat30', '2006-01-02T12:30:00', '2006-01-02T12:30:00'),
+    ('repeat30', '2006-01-02T13:00:00', '2006-01-02T13:00:00'),
+    ('cheat', '2006-01-02T13:15:00', '2006-01-02T13:15:00'),
+    ('repeat30', '2006-01-02T13:30:00', '2006-01-02T13:30:00'),
+    ('cheat', '2006-01-02T14:00:00', '2006-01-02T14:00:00'),
+]
+
+# first and last notification of each timer
+CHKBOUNDS = {
+    'cerebro': (('2006-01-02T14:10:00', '2006-01-02T14:10:00'),
+                ('2006-01-30T14:10:00', '2006-01-30T14:10:00')),
+    'cheat': (('2006-01-02T11:00:00', '2006-01-02T11:00:00'),
+              ('2006-01-30T17:00:00', '2006-01-30T17:00:00')),
+    'monthdays': (('2006-01-03T12:00:00', '2006-01-03T12:00:00'),
+                  ('2006-01-16T12:00:00', '2006-01-16T12:00:00')),
+    'repeat30': (('2006-01-02T10:00:00', '2006-01-02T10:00:00'),
+                 ('2006-01-30T17:30:00', '2006-01-30T17:30:00')),
+    'sessend': (('2006-01-02T17:30:00', '2006-01-02T17:30:00'),
+                ('2006-01-30T17:30:00', '2006-01-30T17:30:00')),
+    'sessoffset': (('2006-01-02T09:15:00', '2006-01-02T09:15:00'),
+                   ('2006-01-30T09:15:00', '2006-01-30T09:15:00')),
+    'weekcarry': (('2006-01-03T09:35:00', '2006-01-03T09:35:00'),
+                  ('2006-01-26T15:35:00', '2006-01-26T15:35:00')),
+}
+
+
+class TimerStrategy(bt.Strategy):
+    '''Adds several timers with different offsets and repeats'''
+    def __init__(self):
+        self.timercalls = list()
+
+        self.add_timer(when=datetime.time(10, 0),
+                       repeat=datetime.timedelta(minutes=30),
+                       name='repeat30')
+        self.add_timer(when=bt.timer.SESSION_START,
+                       offset=datetime.timedelta(minutes=15),
+                       name='sessoffset')
+        self.add_timer(when=bt.timer.SESSION_END,
+                       weekdays=[1, 3, 5],
+                       name='sessend')
+        self.add_timer(when=datetime.time(12, 0),
+                       monthdays=[3, 10, 15, 28], monthcarry=True,
+                       name='monthdays')
+        self.add_timer(when=datetime.time(9, 30),
+                       offset=datetime.timedelta(minutes=5),
+                       repeat=datetime.timedelta(hours=2),
+                       weekdays=[2, 4], weekcarry=True,
+                       name='weekcarry')
+        self.add_timer(when=datetime.time(11, 0),
+                       repeat=datetime.timedelta(minutes=45),
+                       cheat=True,
+                       name='cheat')
+
+    def notify_timer(self, timer, when, name):
+        self.timercalls.append(
+            (name, self.data.datetime.datetime(0).isoformat(),
+             when.isoformat()))
+
+
+def runtimers(runonce, preload):
+    cerebro = bt.Cerebro(runonce=runonce, preload=preload, stdstats=False,
+                         cheat_on_open=True)
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-min-005.txt')
+    data = bt.feeds.BacktraderCSVData(
+        dataname=datapath,
+        timeframe=bt.TimeFrame.Minutes, compression=5,
+        sessionstart=datetime.time(9, 0), sessionend=datetime.time(17, 30))
+    cerebro.adddata(data)
+    cerebro.addstrategy(TimerStrategy)
+    cerebro.add_timer(when=datetime.time(14, 0),
+                      offset=datetime.timedelta(minutes=10),
+                      weekdays=[1, 2, 3], strats=True,
+                      name='cerebro')
+    return cerebro.run()[0].timercalls
+
+
+def test_run(main=False):
+    for runonce, preload in [(True, True), (False, True), (False, False)]:
+        calls = runtimers(runonce=runonce, preload=preload)
+
+        counts = dict()
+        bounds = dict()
+        for name, dt, when in calls:
+            counts[name] = counts.get(name, 0) + 1
+            first = bounds.get(name, ((dt, when),))[0]
+            bounds[name] = (first, (dt, when))
+
+        if main:
+            print('runonce', runonce, 'preload', preload, len(calls))
+            print(counts)
+            for call in calls[:len(CHKFIRST)]:
+                print(call)
+        else:
+            assert counts == CHKCOUNTS
+            assert calls[:len(CHKFIRST)] == CHKFIRST
+            assert bounds == CHKBOUNDS
+
+
+if __name__ == '__main__':
+    test_run(main=True)